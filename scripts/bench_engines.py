@@ -0,0 +1,107 @@
+"""
+Compare the ReportLab templates with the PDFKit port in server/pdf-templates.ts.
+
+    python scripts/bench_engines.py [--sizes 1,10,50,200] [--repeats 5] [--out engines.json]
+
+Feeds the same scaled SAMPLE_DATA payloads (see bench_templates.py) to the
+Python generate_* functions and to generateInvoicePDF / generateEstimatePDF
+/ generateJobSheetPDF, each case in a fresh process, and reports cold and
+median warm render time, peak RSS, output size and pages per engine.
+
+The Node side runs scripts/bench_engines_node.ts with the repo's tsx, so
+``pnpm install`` must have been run. Invoices are rendered customer copy
+only on both sides. Two cases are still not like for like:
+
+- PDFKit estimates always print a customer and an office copy, so their
+  page count and size cover two copies where the Python estimate has one.
+- Job sheets fill their parts table differently. The Python template draws
+  ``parts_rows`` blank rows; the PDFKit one lists ``data.parts``, which the
+  job-sheet payload does not have, so its parts table is only the header
+  and its own few blank rows.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import bench_templates
+from bench_templates import ROOT, DOC_TYPES, scaled_payload
+
+NODE_RUNNER = os.path.join(SCRIPTS_DIR, 'bench_engines_node.ts')
+TSX = os.path.join(ROOT, 'node_modules', '.bin', 'tsx')
+DEFAULT_SIZES = (1, 10, 50, 200)
+
+
+def run_python(doc_type, size, repeats):
+    result, _ = bench_templates.measure_in_child(doc_type, size, repeats)
+    return result
+
+
+def run_node(doc_type, size, repeats):
+    if not os.path.exists(TSX):
+        raise RuntimeError(f"{TSX} not found; run pnpm install first")
+    proc = subprocess.run(
+        [TSX, NODE_RUNNER, doc_type, str(repeats)],
+        input=json.dumps(scaled_payload(doc_type, size)), cwd=ROOT,
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"node runner exited with {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+ENGINES = {'reportlab': run_python, 'pdfkit': run_node}
+
+
+def _cell(value, scale=1.0):
+    return f"{value / scale:10.1f}" if value is not None else f"{'-':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the ReportLab and PDFKit template engines.")
+    parser.add_argument('--types', default=','.join(DOC_TYPES), help="comma-separated document types")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated row counts")
+    parser.add_argument('--repeats', type=int, default=5, help="warm renders per case")
+    parser.add_argument('--engines', default=','.join(ENGINES), help="comma-separated engines to run")
+    parser.add_argument('--out', default='bench-engines.json', help="results file (default: bench-engines.json)")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    print(f"{'case':<16}{'engine':<11}{'cold ms':>10}{'warm ms':>10}{'rss MB':>10}{'pages':>10}{'KB':>10}")
+    for doc_type in args.types.split(','):
+        for size in (int(s) for s in args.sizes.split(',')):
+            for engine in args.engines.split(','):
+                case = f"{doc_type} x{size}"
+                try:
+                    r = ENGINES[engine](doc_type, size, args.repeats)
+                except (RuntimeError, subprocess.CalledProcessError, ValueError) as e:
+                    print(f"{case:<16}{engine:<11}failed: {e}", file=sys.stderr)
+                    results.append({'type': doc_type, 'size': size, 'engine': engine, 'error': str(e)})
+                    failed = True
+                    continue
+                results.append({'type': doc_type, 'size': size, 'engine': engine, **r})
+                print(f"{case:<16}{engine:<11}{_cell(r['cold_ms'])}{_cell(r['warm_ms'])}"
+                      f"{_cell(r['peak_rss_kb'], 1024)}{r['pages']:10d}{_cell(r['bytes'], 1024)}")
+
+    report = {
+        'commit': bench_templates.git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\nResults written to {args.out}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
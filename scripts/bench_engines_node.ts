@@ -0,0 +1,50 @@
+// Node side of scripts/bench_engines.py: renders one payload (JSON on stdin) with the
+// PDFKit templates and prints cold/warm timings, peak RSS, bytes and pages as JSON.
+//   pnpm exec tsx scripts/bench_engines_node.ts <invoice|estimate|jobsheet> <repeats> < payload.json
+import { generateInvoicePDF, generateEstimatePDF, generateJobSheetPDF } from "../server/pdf-templates";
+
+// Invoices render the customer copy only, as the Python template does. Estimates
+// have no such option and always print a customer and an office copy.
+const GENERATORS: Record<string, (data: any) => Promise<{ content: string; filename: string }>> = {
+  invoice: (data) => generateInvoicePDF(data, { customerCopyOnly: true }),
+  estimate: generateEstimatePDF,
+  jobsheet: generateJobSheetPDF,
+};
+
+const [docType, repeatsArg] = process.argv.slice(2);
+const generate = GENERATORS[docType];
+if (!generate) {
+  console.error(`Unknown document type: ${docType}`);
+  process.exit(2);
+}
+const repeats = Number(repeatsArg ?? 5);
+
+const chunks: Buffer[] = [];
+for await (const chunk of process.stdin) chunks.push(chunk as Buffer);
+const data = JSON.parse(Buffer.concat(chunks).toString("utf8"));
+
+async function renderOnce(): Promise<{ ms: number; pdf: Buffer }> {
+  const start = process.hrtime.bigint();
+  const { content } = await generate(data);
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  return { ms, pdf: Buffer.from(content, "base64") };
+}
+
+const cold = await renderOnce();
+const warm: number[] = [];
+for (let i = 0; i < repeats; i++) warm.push((await renderOnce()).ms);
+warm.sort((a, b) => a - b);
+
+// Page objects are written uncompressed, so counting them is enough.
+const pages = (cold.pdf.toString("latin1").match(/\/Type \/Page\b/g) || []).length;
+const round = (ms: number) => Math.round(ms * 100) / 100;
+const mid = warm.length >> 1;
+const median = warm.length % 2 ? warm[mid] : (warm[mid - 1] + warm[mid]) / 2;
+
+console.log(JSON.stringify({
+  cold_ms: round(cold.ms),
+  warm_ms: warm.length ? round(median) : null,
+  peak_rss_kb: process.resourceUsage().maxRSS,
+  pages,
+  bytes: cold.pdf.length,
+}));
@@ -0,0 +1,86 @@
+"""
+Compare FixedTable with the platypus Table it replaced.
+
+    python scripts/bench_tables.py [--sizes 5,50,500] [--repeats 20]
+
+Builds the invoice parts table (the data table style, N body rows) and the
+vehicle table, and times building, measuring and drawing each onto a fresh
+canvas with platypus Table and with eli_tables.FixedTable. Reports the
+median milliseconds per table and the speed-up.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'templates'))
+
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+from eli_helpers import (
+    data_table_style_commands, vehicle_table_style, build_vehicle_data, VEHICLE_COL_WIDTHS_RATIOS,
+)
+from eli_tables import FixedTable
+from invoice_template import SAMPLE_DATA
+
+PAGE_WIDTH = 535.28
+PARTS_COL_WIDTHS = [PAGE_WIDTH * r for r in (0.52, 0.10, 0.14, 0.10, 0.14)]
+DEFAULT_SIZES = (5, 50, 500)
+
+
+def parts_rows(n):
+    """The invoice parts table with the sample parts cycled to ``n`` rows."""
+    items = SAMPLE_DATA['parts']
+    rows = [['Parts', 'Qty', 'Unit', 'D', 'Sub Total']]
+    for i in range(n):
+        item = items[i % len(items)]
+        rows.append([item['description'], str(item.get('qty', '')), f"{item['unit']:.2f}",
+                     str(item.get('d', '')), f"{item['subtotal']:.2f}"])
+    return rows
+
+
+def draw_platypus(c, rows, col_widths, style):
+    table = Table(rows, colWidths=col_widths, style=style)
+    _, height = table.wrap(PAGE_WIDTH, 1e6)
+    table.drawOn(c, 30, 800 - height)
+
+
+def draw_fixed(c, rows, col_widths, style):
+    table = FixedTable(rows, col_widths, style)
+    _, height = table.wrap(PAGE_WIDTH, 1e6)
+    table.drawOn(c, 30, 800 - height)
+
+
+def time_draw(draw, rows, col_widths, style, repeats):
+    times = []
+    for _ in range(repeats):
+        c = canvas.Canvas(os.devnull)
+        start = time.perf_counter()
+        draw(c, rows, col_widths, style)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FixedTable with platypus Table.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated body row counts")
+    parser.add_argument('--repeats', type=int, default=20, help="timed draws per case")
+    args = parser.parse_args()
+
+    cases = [('vehicle', build_vehicle_data(SAMPLE_DATA['vehicle']),
+              [PAGE_WIDTH * r for r in VEHICLE_COL_WIDTHS_RATIOS], vehicle_table_style())]
+    for n in (int(s) for s in args.sizes.split(',')):
+        cases.append((f"parts x{n}", parts_rows(n), PARTS_COL_WIDTHS,
+                      TableStyle(data_table_style_commands())))
+
+    print(f"{'table':<16}{'platypus ms':>13}{'fixed ms':>11}{'speed-up':>10}")
+    for name, rows, col_widths, style in cases:
+        slow = time_draw(draw_platypus, rows, col_widths, style, args.repeats)
+        fast = time_draw(draw_fixed, rows, col_widths, style, args.repeats)
+        print(f"{name:<16}{slow:13.2f}{fast:11.2f}{slow / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
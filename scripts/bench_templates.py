@@ -0,0 +1,193 @@
+"""
+Benchmark the PDF templates across document sizes.
+
+    python scripts/bench_templates.py [--sizes 1,10,50,200,1000] [--repeats 5] \
+        [--out bench.json] [--compare baseline.json]
+
+Each template's SAMPLE_DATA is scaled to N work items / labour / parts rows
+(job sheets: N description lines and N blank labour and parts rows). Every
+(type, size) case runs in a fresh interpreter, which reports:
+
+  cold_ms          first render in that process, timed after the template is
+                   imported: first-use costs (image decoding, section set-up,
+                   empty caches) but not imports, which cold_process_ms covers
+  cold_process_ms  wall time of a whole single-render process, start to exit
+  warm_ms          median of --repeats renders after the first
+  peak_rss_kb      peak resident set size of the measuring process
+  pages, bytes     of the rendered PDF
+
+Results are written as JSON so runs on different commits can be compared
+with --compare.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+import generate_pdf
+
+DOC_TYPES = ('invoice', 'estimate', 'jobsheet')
+DEFAULT_SIZES = (1, 10, 50, 200, 1000)
+
+
+def _cycle(rows, n):
+    return [rows[i % len(rows)] for i in range(n)] if rows else []
+
+
+def scaled_payload(doc_type, n):
+    """The template's sample payload scaled to ``n`` rows per list."""
+    import copy
+    import importlib
+
+    module_name, _ = generate_pdf.RENDERERS[doc_type]
+    data = copy.deepcopy(importlib.import_module(module_name).SAMPLE_DATA)
+    if doc_type == 'jobsheet':
+        data['work_description'] = _cycle([l for l in data['work_description'] if l], n)
+        data['labour_rows'] = n
+        data['parts_rows'] = n
+    else:
+        data['work_items'] = _cycle(data['work_items'], n)
+        data['labour'] = _cycle(data['labour'], n)
+        data['parts'] = _cycle(data['parts'], n)
+    return data
+
+
+def _render(generate, data):
+    import io
+    from eli_helpers import collect_timings
+
+    buffer = io.BytesIO()
+    with collect_timings() as timings:
+        start = time.perf_counter()
+        generate(buffer, data)
+        elapsed = time.perf_counter() - start
+    return elapsed, timings.pages, len(buffer.getvalue())
+
+
+def run_child(doc_type, size, repeats):
+    """Measure one case in this (fresh) process and print the result as JSON."""
+    import resource
+
+    generate = generate_pdf.load_renderer(doc_type)
+    data = scaled_payload(doc_type, size)
+    sys.stdout, real_stdout = sys.stderr, sys.stdout
+
+    cold, pages, size_bytes = _render(generate, data)
+    warm = [_render(generate, data)[0] for _ in range(repeats)]
+
+    sys.stdout = real_stdout
+    print(json.dumps({
+        'cold_ms': round(cold * 1000, 2),
+        'warm_ms': round(statistics.median(warm) * 1000, 2) if warm else None,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'pages': pages,
+        'bytes': size_bytes,
+    }))
+
+
+def measure_in_child(doc_type, size, repeats):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', doc_type, str(size), str(repeats)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), time.perf_counter() - start
+
+
+def run_case(doc_type, size, repeats):
+    result, _ = measure_in_child(doc_type, size, repeats)
+    _, process_seconds = measure_in_child(doc_type, size, 0)
+    result['cold_process_ms'] = round(process_seconds * 1000, 2)
+    return {'type': doc_type, 'size': size, **result}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _reportlab_version():
+    import reportlab
+    return reportlab.Version
+
+
+COMPARE_FIELDS = ('cold_ms', 'warm_ms', 'cold_process_ms', 'peak_rss_kb', 'pages', 'bytes')
+
+
+def compare(baseline, current):
+    """Print per-case changes from ``baseline`` to ``current`` results."""
+    base = {(r['type'], r['size']): r for r in baseline['results']}
+    print(f"\nChange vs {baseline.get('commit') or 'baseline'}:")
+    print(f"{'case':<16}" + ''.join(f"{f:>16}" for f in COMPARE_FIELDS))
+    for r in current['results']:
+        old = base.get((r['type'], r['size']))
+        if old is None:
+            continue
+        cells = []
+        for field in COMPARE_FIELDS:
+            a, b = old.get(field), r.get(field)
+            if not a or b is None:
+                cells.append(f"{'-':>16}")
+            else:
+                cells.append(f"{(b - a) / a * 100:+15.1f}%")
+        print(f"{r['type'] + ' x' + str(r['size']):<16}" + ''.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF templates across document sizes.")
+    parser.add_argument('--types', default=','.join(DOC_TYPES), help="comma-separated document types")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated row counts")
+    parser.add_argument('--repeats', type=int, default=5, help="warm renders per case")
+    parser.add_argument('--out', default='bench-templates.json', help="results file (default: bench-templates.json)")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--child', nargs=3, metavar=('TYPE', 'SIZE', 'REPEATS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        doc_type, size, repeats = args.child
+        run_child(doc_type, int(size), int(repeats))
+        return
+
+    results = []
+    print(f"{'case':<16}{'cold ms':>10}{'warm ms':>10}{'proc ms':>10}{'rss MB':>9}{'pages':>7}{'KB':>9}")
+    for doc_type in args.types.split(','):
+        for size in (int(s) for s in args.sizes.split(',')):
+            r = run_case(doc_type, size, args.repeats)
+            results.append(r)
+            warm = f"{r['warm_ms']:10.1f}" if r['warm_ms'] is not None else f"{'-':>10}"
+            print(f"{doc_type + ' x' + str(size):<16}{r['cold_ms']:10.1f}{warm}{r['cold_process_ms']:10.1f}"
+                  f"{r['peak_rss_kb'] / 1024:9.1f}{r['pages']:7d}{r['bytes'] / 1024:9.1f}")
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'reportlab': _reportlab_version(),
+        'machine': platform.machine(),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
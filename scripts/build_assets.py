@@ -0,0 +1,84 @@
+"""
+Build print-size copies of the template images.
+
+    python scripts/build_assets.py [--out dist/assets] [--dpi 200] [--quality 85]
+
+Each image in templates/ is resampled down to the largest size a template
+prints it at, for --dpi, and re-encoded: the logo as a JPEG, which ReportLab
+embeds as-is, and the grey line-art car diagram as a greyscale PNG. An
+assets.json manifest maps each template image name to its built file;
+point ELI_ASSET_DIR at the output directory and find_image() picks the
+built copies up. build_renderer.py runs this for the packaged renderer.
+"""
+import os
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(ROOT, 'templates')
+MANIFEST = 'assets.json'
+
+# Widest printed size in points, colour mode and format per image. The car
+# diagram is widest on the estimate (48% of the 535pt content width).
+ASSETS = {
+    'eli_logo_white.png': {'width_pt': 120, 'mode': 'RGB', 'format': 'JPEG'},
+    'car_diagram.png': {'width_pt': 535.28 * 0.48, 'mode': 'L', 'format': 'PNG'},
+}
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png'}
+
+
+def build_asset(name, spec, out_dir, dpi, quality):
+    """Resample and encode one image. Returns the built file's name."""
+    from PIL import Image
+
+    with Image.open(os.path.join(TEMPLATES_DIR, name)) as im:
+        im.load()
+    if im.mode in ('RGBA', 'LA', 'P'):
+        # Flatten onto white; the PDF page behind the image is white anyway.
+        im = im.convert('RGBA')
+        flat = Image.new('RGB', im.size, 'white')
+        flat.paste(im, mask=im.getchannel('A'))
+        im = flat
+    im = im.convert(spec['mode'])
+
+    width = round(spec['width_pt'] * dpi / 72.0)
+    if width < im.width:
+        height = max(1, round(im.height * width / im.width))
+        im = im.resize((width, height), Image.LANCZOS)
+
+    out_name = os.path.splitext(name)[0] + EXTENSIONS[spec['format']]
+    out_path = os.path.join(out_dir, out_name)
+    if spec['format'] == 'JPEG':
+        im.save(out_path, 'JPEG', quality=quality, optimize=True)
+    else:
+        im.save(out_path, 'PNG', optimize=True)
+    return out_name
+
+
+def build_assets(out_dir, dpi=200, quality=85):
+    """Build every asset into ``out_dir`` and write the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {name: build_asset(name, spec, out_dir, dpi, quality) for name, spec in ASSETS.items()}
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build print-size copies of the template images.")
+    parser.add_argument('--out', default=os.path.join(ROOT, 'dist', 'assets'),
+                        help="output directory (default: dist/assets)")
+    parser.add_argument('--dpi', type=float, default=200, help="print resolution to resample to")
+    parser.add_argument('--quality', type=int, default=85, help="JPEG quality")
+    args = parser.parse_args()
+
+    manifest = build_assets(args.out, dpi=args.dpi, quality=args.quality)
+    for name, built in manifest.items():
+        src = os.path.getsize(os.path.join(TEMPLATES_DIR, name))
+        out = os.path.getsize(os.path.join(args.out, built))
+        print(f"{name:<22} {src / 1024:7.1f} KB -> {built:<20} {out / 1024:7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
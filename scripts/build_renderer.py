@@ -0,0 +1,76 @@
+"""
+Package the PDF renderer as a zipapp of precompiled bytecode.
+
+    python scripts/build_renderer.py [--out dist/renderer]
+
+Produces <out>/renderer.pyz (generate_pdf, its render_* helper modules
+and templates/, as sourceless .pyc) and builds print-size copies of the
+template images next to it (see build_assets.py). The archive is run as ``python3 renderer.pyz [--worker ...]`` and
+accepts the same requests as scripts/generate_pdf.py. ReportLab itself is
+not bundled. Bytecode is tied to the interpreter version, so build with
+the same Python that will run it.
+"""
+import os
+import sys
+import glob
+import zipapp
+import argparse
+import tempfile
+import py_compile
+
+import build_assets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(ROOT, 'templates')
+
+MAIN_PY = '''import os
+import sys
+
+# Images ship beside the archive rather than inside it.
+os.environ.setdefault('ELI_ASSET_DIR', os.path.dirname(os.path.abspath(sys.argv[0])))
+
+import generate_pdf
+generate_pdf.main()
+'''
+
+
+def module_sources():
+    sources = [os.path.join(ROOT, 'scripts', name) for name in ('generate_pdf.py', 'render_metrics.py', 'render_trace.py')]
+    sources += sorted(glob.glob(os.path.join(TEMPLATES_DIR, '*.py')))
+    return sources
+
+
+def build(out_dir, dpi=200, quality=85):
+    os.makedirs(out_dir, exist_ok=True)
+    target = os.path.join(out_dir, 'renderer.pyz')
+
+    with tempfile.TemporaryDirectory() as staging:
+        for src in module_sources():
+            name = os.path.splitext(os.path.basename(src))[0]
+            # zipimport only finds legacy (non-__pycache__) .pyc locations.
+            py_compile.compile(src, cfile=os.path.join(staging, f'{name}.pyc'),
+                               doraise=True, optimize=1)
+        with open(os.path.join(staging, '__main__.py'), 'w') as f:
+            f.write(MAIN_PY)
+        # Stored uncompressed: zlib inflation would cost more than the read.
+        zipapp.create_archive(staging, target, interpreter='/usr/bin/env python3')
+
+    build_assets.build_assets(out_dir, dpi=dpi, quality=quality)
+
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the packaged PDF renderer.")
+    parser.add_argument('--out', default=os.path.join(ROOT, 'dist', 'renderer'),
+                        help="output directory (default: dist/renderer)")
+    parser.add_argument('--dpi', type=float, default=200, help="print resolution for the images")
+    parser.add_argument('--quality', type=int, default=85, help="JPEG quality for the logo")
+    args = parser.parse_args()
+
+    target = build(args.out, dpi=args.dpi, quality=args.quality)
+    print(f"Renderer built: {target} (Python {sys.version_info.major}.{sys.version_info.minor})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Check renderer import time against the recorded budget.
+
+    python scripts/check_import_budget.py [--target dist/renderer/renderer.pyz]
+    python scripts/check_import_budget.py --record
+
+Each scenario runs in a fresh interpreter under ``-X importtime`` and is
+measured as the sum of top-level cumulative import times (best of --runs).
+Exits non-zero if any scenario is over budget or if bare startup pulls in
+a module listed under ``forbidden_at_startup``. --record rewrites the
+budget file from the current measurements plus headroom.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(SCRIPTS_DIR, 'import_budget.json')
+
+SCENARIOS = {
+    'startup': "import generate_pdf",
+    'invoice': "import generate_pdf; generate_pdf.load_renderer('invoice')",
+    'estimate': "import generate_pdf; generate_pdf.load_renderer('estimate')",
+    'jobsheet': "import generate_pdf; generate_pdf.load_renderer('jobsheet')",
+}
+
+
+def measure(target, code):
+    """Run ``code`` once under -X importtime. Returns (total_ms, module names)."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f"import sys; sys.path.insert(0, {target!r}); {code}"],
+        capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        # Nested imports are indented; only top-level entries are summed.
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000.0, modules
+
+
+def best_of(target, code, runs):
+    results = [measure(target, code) for _ in range(runs)]
+    return min(ms for ms, _ in results), results[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check renderer import time against the recorded budget.")
+    parser.add_argument('--target', default=SCRIPTS_DIR,
+                        help="directory or renderer.pyz to import from (default: scripts/)")
+    parser.add_argument('--runs', type=int, default=5, help="runs per scenario; the fastest counts")
+    parser.add_argument('--record', action='store_true',
+                        help="write current measurements plus headroom to the budget file")
+    parser.add_argument('--headroom', type=float, default=1.5,
+                        help="multiplier applied to measurements when recording")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    failures = []
+    measured = {}
+    for scenario, code in SCENARIOS.items():
+        ms, modules = best_of(args.target, code, args.runs)
+        measured[scenario] = ms
+        limit = budget['budgets_ms'].get(scenario)
+        status = 'ok'
+        if limit is not None and ms > limit:
+            status = 'OVER'
+            failures.append(f"{scenario}: {ms:.1f} ms > {limit} ms")
+        print(f"{scenario:10s} {ms:8.1f} ms   budget {limit if limit is not None else '-':>6} ms   {status}")
+
+        if scenario == 'startup':
+            for prefix in budget.get('forbidden_at_startup', []):
+                leaked = sorted(m for m in modules if m == prefix or m.startswith(prefix + '.'))
+                if leaked:
+                    failures.append(f"startup imports {prefix} ({leaked[0]})")
+
+    if args.record:
+        budget['python'] = f"{sys.version_info.major}.{sys.version_info.minor}"
+        budget['budgets_ms'] = {k: round(v * args.headroom) for k, v in measured.items()}
+        with open(BUDGET_FILE, 'w') as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Budget recorded to {BUDGET_FILE}")
+        return
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,595 @@
+import io
 import os
 import sys
 import json
+import time
 import base64
+import signal
+import socket
+import argparse
+import tempfile
+import importlib
+import threading
 
-# Ensure the root directory and templates directory are in the path
-sys.path.append(os.getcwd())
-sys.path.append(os.path.join(os.getcwd(), 'templates'))
+# The templates import eli_helpers as a top-level module, so their directory
+# must be importable. Inside the packaged zipapp they sit next to this module
+# and are already on the path.
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+if os.path.isdir(TEMPLATES_DIR) and TEMPLATES_DIR not in sys.path:
+    sys.path.insert(0, TEMPLATES_DIR)
 
-from templates.invoice_template import generate_invoice
-from templates.estimate_template import generate_estimate
-from templates.jobsheet_template import generate_job_sheet
+# Template modules are imported on first use so a process that only ever
+# renders job sheets never pays for the other templates.
+RENDERERS = {
+    'invoice': ('invoice_template', 'generate_invoice'),
+    'estimate': ('estimate_template', 'generate_estimate'),
+    'jobsheet': ('jobsheet_template', 'generate_job_sheet'),
+}
 
-def main():
+
+def load_renderer(doc_type):
+    """Return the generate_* function for ``doc_type``, or None if unknown."""
+    spec = RENDERERS.get(doc_type)
+    if spec is None:
+        return None
+    module_name, func_name = spec
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def render(request, jobs=1):
+    """Render one request dict. Returns the JSON reply as a dict."""
+    if request.get('type') == 'batch':
+        return render_batch(request, jobs=jobs)
+    return render_document(request)
+
+
+OUTPUT_MODES = ('file', 'base64')
+
+# Largest PDF we hand back, so documents stay inside the 5 MB media limit
+# of Twilio MMS (WhatsApp documents allow more). ELI_PDF_MAX_BYTES or a
+# request's ``maxBytes`` overrides it; 0 disables the check.
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+# Replies from render_document carry internal stats under this key until
+# publish() strips them and hands them to the observers (e.g. metrics).
+STATS_KEY = '_stats'
+_observers = []
+_metrics = None
+_metrics_path = None
+
+
+def add_observer(observer):
+    """Call ``observer(stats_list)`` with the stats of every published reply."""
+    _observers.append(observer)
+
+
+def publish(reply):
+    """Strip render stats from a reply (and its batch results) and report them."""
+    replies = [reply]
+    if isinstance(reply.get('results'), list):
+        replies += reply['results']
+    stats = [r.pop(STATS_KEY) for r in replies if STATS_KEY in r]
+    if stats:
+        for observer in _observers:
+            observer(stats)
+    return reply
+
+
+def enable_metrics(path=None, const_labels=None):
+    """Collect render metrics; if ``path`` is given, rewrite it after each reply."""
+    global _metrics, _metrics_path
+    from render_metrics import RenderMetrics
+
+    _metrics = RenderMetrics(const_labels)
+    _metrics_path = path
+
+    def record(stats):
+        for s in stats:
+            _metrics.observe(s)
+
+    add_observer(record)
+    set_queue_depth(0)  # writes the initial, all-zero file
+    return _metrics
+
+
+def enable_trace_log(path):
+    """Append one NDJSON trace record per rendered document to ``path``."""
+    from render_trace import TraceLog
+    add_observer(TraceLog(path).write)
+
+
+def set_queue_depth(depth):
+    if _metrics is not None:
+        _metrics.set_queue_depth(depth)
+        if _metrics_path:
+            _write_atomic(_metrics_path, _metrics.render().encode())
+
+
+def _unique_output_path():
+    fd, path = tempfile.mkstemp(prefix='eli-', suffix='.pdf')
+    os.close(fd)
+    return path
+
+
+def _read_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp creates files 0600; give renamed files the mode a plain open()
+# would, honouring the umask. Read once: os.umask can only be read by
+# setting it, which is not safe once render threads are running.
+_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def _write_atomic(path, content):
+    """Write to a unique temp name beside ``path`` and rename it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp_path, _FILE_MODE)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _max_output_bytes(request):
+    if 'maxBytes' in request:
+        return int(request['maxBytes'] or 0)
+    return int(os.environ.get('ELI_PDF_MAX_BYTES', DEFAULT_MAX_BYTES))
+
+
+def _profile_enabled(request):
+    if 'profile' in request:
+        return bool(request['profile'])
+    return os.environ.get('ELI_PDF_PROFILE', '') not in ('', '0')
+
+
+_tracing_lock = threading.Lock()
+_profiled_renders = 0  # profiled renders in progress
+_started_tracing = False  # whether they turned tracemalloc on
+
+
+def _profiled_render(generate, output, data):
+    """Run one render under cProfile and tracemalloc.
+
+    tracemalloc is process-wide and slows everything it traces, so it runs
+    only while at least one profiled render is in progress: the first to
+    start turns it on and the last to finish turns it off. With concurrent
+    renders the memory figures include allocations from the others.
+    """
+    import cProfile
+    import tracemalloc
+    global _profiled_renders, _started_tracing
+
+    with _tracing_lock:
+        if _profiled_renders == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _started_tracing = True
+        _profiled_renders += 1
+    try:
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        profiler.runcall(generate, output, data)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        with _tracing_lock:
+            _profiled_renders -= 1
+            if _profiled_renders == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+    return profiler, snapshot, peak
+
+
+def _write_profile(base_path, profiler, snapshot, peak, top=20):
+    """Write ``<base>.pstats`` and ``<base>.memory.txt``. Returns their paths."""
+    pstats_path = f"{base_path}.pstats"
+    memory_path = f"{base_path}.memory.txt"
+    profiler.dump_stats(pstats_path)
+
+    stats = snapshot.statistics('lineno')
+    with open(memory_path, 'w') as f:
+        f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+        f.write(f"Live at end of render: {sum(st.size for st in stats) / 1024:.1f} KiB\n\n")
+        f.write(f"Top {top} allocation sites:\n")
+        for st in stats[:top]:
+            f.write(f"{st}\n")
+    return {"pstats": pstats_path, "memory": memory_path, "peak_bytes": peak}
+
+
+LINE_ITEM_KEYS = ('work_items', 'work_description', 'oil_specs', 'mot', 'labour', 'parts')
+
+
+def _line_item_counts(data):
+    if not isinstance(data, dict):
+        return {}
+    return {key: len(data[key]) for key in LINE_ITEM_KEYS if isinstance(data.get(key), list)}
+
+
+def _phase_ms(timings):
+    return {phase: round(seconds * 1000, 3) for phase, seconds in timings.phases.items()}
+
+
+def render_document(request):
+    """Render a single invoice, estimate or job sheet request.
+
+    The PDF is always rendered into memory. With ``"output": "base64"`` the
+    bytes come back in the reply's ``pdf`` field; otherwise they are written
+    atomically to ``outputFile`` (or a fresh temp file when it is omitted).
+
+    With ``"timings": true`` the reply also carries ``timings`` (milliseconds
+    per render phase: header, each table's wrap/drawOn, images, save, plus
+    the overall render and output step) and the document's ``pages``.
+    Phases nest, so the logo's image time is also counted in the header.
+
+    With ``"profile": true`` (or ``ELI_PDF_PROFILE=1`` in the environment)
+    the render runs under cProfile and tracemalloc, and a ``.pstats`` file
+    plus a ``.memory.txt`` peak/top-allocations summary are written next to
+    the PDF (in ``profileDir`` or the temp dir for base64 output).
+
+    A PDF larger than ``maxBytes`` (default ``ELI_PDF_MAX_BYTES``, else
+    DEFAULT_MAX_BYTES) is not written and the reply is an error.
+    """
+    started = time.perf_counter()
+    doc_type = request.get('type') # 'invoice', 'estimate', 'jobsheet'
+    timings = None
     try:
-        # Read JSON data from stdin
-        line = sys.stdin.readline()
-        if not line:
-            return
-        
-        request = json.loads(line)
-        doc_type = request.get('type') # 'invoice', 'estimate', 'jobsheet'
         data = request.get('data')
-        output_file = request.get('outputFile', '/tmp/output.pdf')
-        
-        if doc_type == 'invoice':
-            generate_invoice(output_file, data)
-        elif doc_type == 'estimate':
-            generate_estimate(output_file, data)
-        elif doc_type == 'jobsheet':
-            generate_job_sheet(output_file, data)
+        output_mode = request.get('output', 'file')
+
+        generate = load_renderer(doc_type)
+        if generate is None:
+            raise ValueError(f"Unknown document type: {doc_type}")
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode}")
+
+        # The template modules import eli_helpers, so it is loaded by now.
+        from eli_helpers import collect_timings, timed
+
+        buffer = io.BytesIO()
+        with collect_timings() as timings:
+            with timed('render'):
+                if _profile_enabled(request):
+                    profile_run = _profiled_render(generate, buffer, data)
+                else:
+                    profile_run = None
+                    generate(buffer, data)
+            pdf = buffer.getvalue()
+            max_bytes = _max_output_bytes(request)
+            if max_bytes and len(pdf) > max_bytes:
+                raise ValueError(f"PDF is {len(pdf)} bytes, over the {max_bytes} byte limit")
+
+            with timed('output'):
+                if output_mode == 'base64':
+                    reply = {"success": True, "pdf": base64.b64encode(pdf).decode('ascii'), "bytes": len(pdf)}
+                else:
+                    output_file = request.get('outputFile') or _unique_output_path()
+                    _write_atomic(output_file, pdf)
+                    reply = {"success": True, "path": output_file, "bytes": len(pdf)}
+
+        if profile_run is not None:
+            if 'path' in reply:
+                base_path = os.path.splitext(reply['path'])[0]
+            else:
+                profile_dir = request.get('profileDir') or tempfile.gettempdir()
+                base_path = os.path.join(profile_dir, f"eli-{doc_type}-{os.getpid()}-{time.time_ns()}")
+            reply['profile'] = _write_profile(base_path, *profile_run)
+
+        if request.get('timings'):
+            reply['timings'] = _phase_ms(timings)
+            reply['pages'] = timings.pages
+
+    except Exception as e:
+        reply = {"error": str(e)}
+
+    reply[STATS_KEY] = {
+        'type': doc_type if doc_type in RENDERERS else 'unknown',
+        'correlation_id': request.get('correlationId'),
+        'ok': 'error' not in reply,
+        'error': reply.get('error'),
+        'seconds': time.perf_counter() - started,
+        'bytes': reply.get('bytes'),
+        'pages': timings.pages if timings is not None else None,
+        'items': _line_item_counts(request.get('data')),
+        'phases': _phase_ms(timings) if timings is not None else {},
+    }
+    return reply
+
+
+def render_item(item):
+    """Render one batch item, echoing its ``id`` if it has one."""
+    if not isinstance(item, dict):
+        return {"error": "Batch item must be a JSON object"}
+    if item.get('type') == 'batch':
+        reply = {"error": "Nested batches are not supported"}
+    else:
+        reply = render_document(item)
+    if 'id' in item:
+        reply['id'] = item['id']
+    return reply
+
+
+def _init_pool_worker():
+    # Keep generator progress messages off the parent's protocol stream.
+    sys.stdout = sys.stderr
+
+
+def render_batch(request, jobs=1):
+    """Render every item of a ``{"type": "batch", "items": [...]}`` request.
+
+    A failing item is reported in its own result and does not stop the rest
+    of the batch; results are returned in item order. ``"workers": N`` on the
+    request (or ``--jobs N`` on the command line) spreads the items across a
+    pool of N processes.
+    """
+    items = request.get('items')
+    if not isinstance(items, list):
+        return {"error": "Batch request needs an 'items' list"}
+    try:
+        workers = int(request.get('workers') or jobs)
+    except (TypeError, ValueError):
+        return {"error": f"Invalid workers value: {request.get('workers')}"}
+
+    workers = min(workers, len(items))
+    if workers <= 1:
+        results = [render_item(item) for item in items]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_pool_worker) as pool:
+                # map() yields in submission order, so results stay deterministic.
+                chunksize = max(1, len(items) // (workers * 4))
+                results = list(pool.map(render_item, items, chunksize=chunksize))
+        except Exception as e:
+            return {"error": f"Batch worker pool failed: {e}"}
+    failed = sum(1 for r in results if 'error' in r)
+    return {"success": True, "results": results, "failed": failed}
+
+
+def handle_line(line, jobs=1):
+    """Parse one NDJSON request line and render it.
+
+    If the request carries an ``id`` it is echoed back on the reply so the
+    caller can match replies that complete out of order.
+    """
+    start = time.perf_counter()
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return {"error": f"Invalid JSON: {e}"}
+    parse_seconds = time.perf_counter() - start
+    if not isinstance(request, dict):
+        return {"error": "Request must be a JSON object"}
+    if request.get('type') == 'metrics':
+        if _metrics is None:
+            reply = {"error": "Metrics are not enabled"}
         else:
-            print(json.dumps({"error": f"Unknown document type: {doc_type}"}))
+            reply = {"success": True, "metrics": _metrics.render()}
+    else:
+        reply = publish(render(request, jobs=jobs))
+    if 'timings' in reply:
+        reply['timings']['parse'] = round(parse_seconds * 1000, 3)
+    if 'id' in request:
+        reply['id'] = request['id']
+    return reply
+
+
+def serve(stdin, stdout, concurrency=1, jobs=1):
+    """Worker mode: one JSON reply line per request line until stdin closes.
+
+    With concurrency 1 replies are written in request order. With more,
+    up to ``concurrency`` renders run at once and each reply is written as
+    soon as it completes, so callers should tag requests with an ``id``.
+
+    The generators print progress messages; those go to stderr here so that
+    stdout only ever carries protocol replies.
+    """
+    write_lock = threading.Lock()
+    outstanding = 0
+
+    def respond(line):
+        nonlocal outstanding
+        reply = json.dumps(handle_line(line, jobs=jobs))
+        with write_lock:
+            stdout.write(reply + "\n")
+            stdout.flush()
+            outstanding -= 1
+            set_queue_depth(outstanding)
+
+    def admit():
+        nonlocal outstanding
+        with write_lock:
+            outstanding += 1
+            set_queue_depth(outstanding)
+
+    previous_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        if concurrency <= 1:
+            for line in stdin:
+                if line.strip():
+                    admit()
+                    respond(line)
             return
 
-        print(json.dumps({"success": True, "path": output_file}))
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for line in stdin:
+                if line.strip():
+                    admit()
+                    pool.submit(respond, line)
+    finally:
+        sys.stdout = previous_stdout
 
-    except Exception as e:
-        print(json.dumps({"error": str(e)}))
+
+def load_assets():
+    """Resolve and decode the template images now, reporting missing ones.
+
+    Long-running modes call this at start-up; a one-shot render loads the
+    images on first use instead.
+    """
+    import eli_helpers
+    return eli_helpers.load_assets()
+
+
+def warm_up():
+    """Import every template, decode the images and render each type once.
+
+    Done in the prefork supervisor so workers inherit the loaded modules,
+    decoded images and first-render caches (fonts, styles) copy-on-write.
+    """
+    load_assets()
+    for doc_type, (module_name, _) in RENDERERS.items():
+        generate = load_renderer(doc_type)
+        generate(io.BytesIO(), importlib.import_module(module_name).SAMPLE_DATA)
+
+
+def _prefork_worker(listener, jobs):
+    """Accept connections one at a time and serve NDJSON on each."""
+    while True:
+        conn, _ = listener.accept()
+        with conn, conn.makefile('r') as rfile, conn.makefile('w') as wfile:
+            try:
+                serve(rfile, wfile, jobs=jobs)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def _slot_path(path, slot):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{slot}{ext}"
+
+
+def serve_prefork(socket_path, workers, jobs=1, metrics_file=None, trace_log=None):
+    """Warm up once, then fork ``workers`` processes sharing a Unix socket.
+
+    Each worker accepts one connection at a time and answers it with the
+    same NDJSON protocol as --worker. Workers that die are respawned;
+    SIGTERM or SIGINT stops the workers and removes the socket.
+
+    With ``metrics_file`` each worker slot writes its own file (``m.prom``
+    becomes ``m.0.prom``, ``m.1.prom``, ...) with a ``worker`` label.
+    ``trace_log`` is split per slot the same way.
+    """
+    warm_up()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(128)
+
+    children = {}
+    stopping = False
+
+    def spawn(slot):
+        # Block the stop signals across the fork so a child never runs the
+        # supervisor's stop() handler before it has reset its own.
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            for signum in STOP_SIGNALS:
+                signal.signal(signum, signal.SIG_DFL)
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+            code = 0
+            try:
+                if metrics_file:
+                    enable_metrics(_slot_path(metrics_file, slot), {'worker': str(slot)})
+                if trace_log:
+                    enable_trace_log(_slot_path(trace_log, slot))
+                _prefork_worker(listener, jobs)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (slot, time.monotonic())
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, stop)
+    for slot in range(workers):
+        spawn(slot)
+    print(f"Renderer listening on {socket_path} with {workers} workers", file=sys.stderr)
+
+    try:
+        while children:
+            pid, status = os.wait()
+            child = children.pop(pid, None)
+            if stopping or child is None:
+                continue
+            slot, started = child
+            print(f"Worker {pid} exited with status {status}; respawning", file=sys.stderr)
+            # Don't spin if workers die straight after starting.
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+            spawn(slot)
+    finally:
+        listener.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Render ELI Motors PDFs from JSON requests on stdin.")
+    parser.add_argument('--worker', action='store_true',
+                        help="keep reading NDJSON requests until stdin closes")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="renders in flight at once in worker mode (replies may arrive out of order)")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="processes used to render batch items (a batch's \"workers\" overrides this)")
+    parser.add_argument('--prefork', type=int, metavar='N',
+                        help="warm up once, then serve on --socket with N forked workers")
+    parser.add_argument('--socket', help="Unix socket path for --prefork")
+    parser.add_argument('--metrics-file',
+                        help="rewrite this Prometheus text file after each reply (--worker/--prefork)")
+    parser.add_argument('--trace-log', default=os.environ.get('ELI_PDF_TRACE_LOG'),
+                        help="append an NDJSON trace record per document (default: $ELI_PDF_TRACE_LOG)")
+    args = parser.parse_args(argv)
+    if args.prefork and not args.socket:
+        parser.error("--prefork requires --socket")
+    return args
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.prefork:
+        serve_prefork(args.socket, args.prefork, jobs=args.jobs,
+                      metrics_file=args.metrics_file, trace_log=args.trace_log)
+        return
+    if args.trace_log:
+        enable_trace_log(args.trace_log)
+    if args.worker:
+        enable_metrics(args.metrics_file)
+        load_assets()
+        serve(sys.stdin, sys.stdout, concurrency=args.concurrency, jobs=args.jobs)
+        return
+
+    # Read JSON data from stdin
+    line = sys.stdin.readline()
+    if not line:
+        return
+
+    print(json.dumps(handle_line(line, jobs=args.jobs)))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,284 @@
+"""
+Load generator for the PDF renderer, with a p99 latency SLO check.
+
+    python scripts/render_loadgen.py --workers 4 --rate 20 --duration 30 --slo-p99-ms 500
+    python scripts/render_loadgen.py --socket /tmp/eli-render.sock --concurrency 8 --requests 500
+
+Replays a weighted mix of document types (--mix, default 70% invoices, 20%
+job sheets, 10% estimates, built from each template's SAMPLE_DATA) against
+either --workers N ``generate_pdf.py --worker`` processes or a render
+socket (render_server.py or ``generate_pdf.py --prefork``), with one
+request in flight per worker or connection. Each worker or connection
+renders every type in the mix once before timing starts.
+
+With --rate, requests arrive as a Poisson process at that many per second
+and latency is measured from each request's arrival, so time spent waiting
+for a free worker counts. Without it every client sends its next request
+as soon as the previous one returns.
+
+Prints throughput, error and busy counts and p50/p95/p99 latency, overall
+and per type. Exits 1 if p99 is over --slo-p99-ms.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import random
+import socket
+import shutil
+import argparse
+import tempfile
+import importlib
+import threading
+import subprocess
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import generate_pdf
+from render_trace import percentile
+
+DEFAULT_MIX = 'invoice=70,jobsheet=20,estimate=10'
+
+
+def parse_mix(text):
+    """Parse ``type=weight,...`` into a list of (type, weight)."""
+    mix = []
+    for part in text.split(','):
+        doc_type, _, weight = part.partition('=')
+        doc_type = doc_type.strip()
+        if doc_type not in generate_pdf.RENDERERS:
+            raise ValueError(f"Unknown document type in mix: {doc_type}")
+        mix.append((doc_type, float(weight or 1)))
+    return mix
+
+
+def sample_payloads(doc_types):
+    payloads = {}
+    for doc_type in doc_types:
+        module_name, _ = generate_pdf.RENDERERS[doc_type]
+        payloads[doc_type] = importlib.import_module(module_name).SAMPLE_DATA
+    return payloads
+
+
+class WorkerClient:
+    """One ``generate_pdf.py --worker`` process, used one request at a time."""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.join(SCRIPTS_DIR, 'generate_pdf.py'), '--worker'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+
+    def send(self, request):
+        self.proc.stdin.write(json.dumps(request) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise ConnectionError("worker exited")
+        return json.loads(line)
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+class SocketClient:
+    """One connection to a render socket, used one request at a time."""
+
+    def __init__(self, path):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.rfile = self.sock.makefile('r')
+        self.wfile = self.sock.makefile('w')
+
+    def send(self, request):
+        self.wfile.write(json.dumps(request) + "\n")
+        self.wfile.flush()
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("render socket closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.rfile.close()
+        self.wfile.close()
+        self.sock.close()
+
+
+class LoadRun:
+    def __init__(self, make_client, clients, payloads, mix, rate, total, duration, out_dir, seed=None):
+        self.make_client = make_client
+        self.clients = clients
+        self.payloads = payloads
+        self.types = [t for t, _ in mix]
+        self.weights = [w for _, w in mix]
+        self.rate = rate
+        self.total = total
+        self.duration = duration
+        self.out_dir = out_dir
+        self.random = random.Random(seed)
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.results = []  # (type, seconds, outcome)
+        self.issued = 0
+
+    def _next_job(self, arrival):
+        """The next (type, arrival time), or None once the run is over."""
+        with self.lock:
+            if self.total is not None and self.issued >= self.total:
+                return None
+            if self.duration is not None and arrival - self.started >= self.duration:
+                return None
+            self.issued += 1
+            return self.random.choices(self.types, self.weights)[0], arrival
+
+    def _arrivals(self):
+        """Feed jobs to the clients as a Poisson process at ``rate``/s."""
+        due = self.started
+        while True:
+            due += self.random.expovariate(self.rate)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            job = self._next_job(due)
+            if job is None:
+                break
+            self.jobs.put(job)
+        for _ in range(self.clients):
+            self.jobs.put(None)
+
+    def _warm_up(self, client):
+        """Render each type once so process start-up is not timed."""
+        for doc_type in self.types:
+            output_file = os.path.join(self.out_dir, f"warmup-{id(client)}-{doc_type}.pdf")
+            client.send({"type": doc_type, "data": self.payloads[doc_type], "outputFile": output_file})
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def _client(self, index, client):
+        try:
+            n = 0
+            while True:
+                job = self.jobs.get() if self.rate else self._next_job(time.perf_counter())
+                if job is None:
+                    break
+                doc_type, arrival = job
+                n += 1
+                output_file = os.path.join(self.out_dir, f"{index}-{n}.pdf")
+                request = {"type": doc_type, "data": self.payloads[doc_type], "outputFile": output_file}
+                try:
+                    reply = client.send(request)
+                except (OSError, ValueError) as e:
+                    print(f"Client {index}: {e}", file=sys.stderr)
+                    self._record(doc_type, time.perf_counter() - arrival, 'error')
+                    break
+                if reply.get('busy'):
+                    outcome = 'busy'
+                elif reply.get('success'):
+                    outcome = 'ok'
+                else:
+                    outcome = 'error'
+                self._record(doc_type, time.perf_counter() - arrival, outcome)
+                if os.path.exists(output_file):
+                    os.unlink(output_file)
+        finally:
+            client.close()
+
+    def _record(self, doc_type, seconds, outcome):
+        with self.lock:
+            self.results.append((doc_type, seconds, outcome))
+
+    def run(self):
+        clients = [self.make_client() for _ in range(self.clients)]
+        warmers = [threading.Thread(target=self._warm_up, args=(c,)) for c in clients]
+        for t in warmers:
+            t.start()
+        for t in warmers:
+            t.join()
+
+        self.started = time.perf_counter()
+        threads = [threading.Thread(target=self._client, args=(i, c)) for i, c in enumerate(clients)]
+        if self.rate:
+            threads.append(threading.Thread(target=self._arrivals, daemon=True))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self.results
+
+
+def report(results, elapsed):
+    """Print the run summary. Returns the overall p99 in milliseconds."""
+    ok = sorted(s * 1000 for _, s, outcome in results if outcome == 'ok')
+    errors = sum(1 for *_, outcome in results if outcome == 'error')
+    busy = sum(1 for *_, outcome in results if outcome == 'busy')
+
+    print(f"{len(results)} requests in {elapsed:.1f} s: {len(ok) / elapsed:.1f} docs/s ok, "
+          f"{errors} errors, {busy} busy")
+    print(f"{'type':<10}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+    def row(name, values):
+        cells = ''.join(f"{percentile(values, p):10.1f}" if values else f"{'-':>10}" for p in (50, 95, 99))
+        peak = f"{values[-1]:10.1f}" if values else f"{'-':>10}"
+        print(f"{name:<10}{len(values):>7}{cells}{peak}")
+
+    for doc_type in sorted({t for t, _, _ in results}):
+        row(doc_type, sorted(s * 1000 for t, s, outcome in results if t == doc_type and outcome == 'ok'))
+    row('all', ok)
+    return percentile(ok, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a request mix against the PDF renderer.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--workers', type=int, help="spawn this many generate_pdf.py --worker processes")
+    target.add_argument('--socket', help="render socket to connect to")
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help="connections to open with --socket (default: 4)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"type=weight,... (default: {DEFAULT_MIX})")
+    parser.add_argument('--rate', type=float, help="arrivals per second (default: send back to back)")
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument('--requests', type=int, help="stop after this many requests")
+    limit.add_argument('--duration', type=float, help="stop issuing requests after this many seconds")
+    parser.add_argument('--slo-p99-ms', type=float, help="fail if p99 latency is over this")
+    parser.add_argument('--seed', type=int, help="random seed for the mix and arrivals")
+    args = parser.parse_args()
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.workers:
+        make_client, clients = WorkerClient, args.workers
+    else:
+        make_client, clients = (lambda: SocketClient(args.socket)), args.concurrency
+
+    out_dir = tempfile.mkdtemp(prefix='eli-loadgen-')
+    try:
+        run = LoadRun(make_client, clients, sample_payloads(t for t, _ in mix), mix,
+                      rate=args.rate, total=args.requests, duration=args.duration,
+                      out_dir=out_dir, seed=args.seed)
+        results = run.run()
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    if not results:
+        print("No requests completed.", file=sys.stderr)
+        sys.exit(1)
+    p99 = report(results, run.elapsed)
+    if args.slo_p99_ms is not None:
+        if p99 is None or p99 > args.slo_p99_ms:
+            shown = f"{p99:.1f} ms" if p99 is not None else "no successful renders"
+            print(f"FAIL p99 {shown} over SLO {args.slo_p99_ms:g} ms", file=sys.stderr)
+            sys.exit(1)
+        print(f"p99 within SLO {args.slo_p99_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Prometheus text-format metrics for long-running PDF renderers.
+
+Fed with the per-document stats generate_pdf.py attaches to replies, this
+keeps counters and histograms per document type and renders them in the
+Prometheus exposition format, for a node_exporter textfile collector or
+the render server's ``{"type": "metrics"}`` request.
+"""
+import threading
+
+DOC_TYPES = ('invoice', 'estimate', 'jobsheet')
+
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SIZE_BUCKETS = (16e3, 32e3, 64e3, 128e3, 256e3, 512e3, 1e6, 2e6, 5e6, 16e6)  # bytes
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    body = ','.join(f'{k}="{v}"' for k, v in labels.items())
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        out = []
+        for bound, count in zip(self.buckets, self.counts):
+            out.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {count}")
+        out.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {self.count}")
+        out.append(f"{name}_sum{_format_labels(labels)} {_format_value(self.sum)}")
+        out.append(f"{name}_count{_format_labels(labels)} {self.count}")
+        return out
+
+
+class RenderMetrics:
+    """Counters and histograms for rendered documents, keyed by type.
+
+    ``const_labels`` are added to every series, e.g. a worker label when
+    several processes write their own files.
+    """
+
+    def __init__(self, const_labels=None):
+        self.const_labels = dict(const_labels or {})
+        self.lock = threading.Lock()
+        self.rendered = {t: 0 for t in DOC_TYPES}
+        self.errors = {t: 0 for t in DOC_TYPES + ('unknown',)}
+        self.latency = {t: Histogram(LATENCY_BUCKETS) for t in DOC_TYPES}
+        self.size = {t: Histogram(SIZE_BUCKETS) for t in DOC_TYPES}
+        self.pages = {t: Histogram(PAGE_BUCKETS) for t in DOC_TYPES}
+        self.queue_depth = 0
+
+    def observe(self, stats):
+        """Record one document's render stats."""
+        doc_type = stats.get('type')
+        with self.lock:
+            if doc_type not in DOC_TYPES:
+                # Requests for unknown types can only fail.
+                self.errors['unknown'] += 1
+                return
+            if not stats.get('ok'):
+                self.errors[doc_type] += 1
+                return
+            self.rendered[doc_type] += 1
+            self.latency[doc_type].observe(stats['seconds'])
+            if stats.get('bytes') is not None:
+                self.size[doc_type].observe(stats['bytes'])
+            if stats.get('pages') is not None:
+                self.pages[doc_type].observe(stats['pages'])
+
+    def set_queue_depth(self, depth):
+        with self.lock:
+            self.queue_depth = depth
+
+    def render(self):
+        """Return all metrics in Prometheus text exposition format."""
+        const = self.const_labels
+        lines = []
+        with self.lock:
+            def counter(name, help_text, values):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for doc_type, value in values.items():
+                    lines.append(f"{name}{_format_labels({**const, 'type': doc_type})} {value}")
+
+            def histogram(name, help_text, hists):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for doc_type, hist in hists.items():
+                    lines.extend(hist.lines(name, {**const, 'type': doc_type}))
+
+            counter('eli_pdf_documents_rendered_total', "Documents rendered successfully.", self.rendered)
+            counter('eli_pdf_render_errors_total', "Document renders that failed.", self.errors)
+            histogram('eli_pdf_render_seconds', "Wall time to render one document.", self.latency)
+            histogram('eli_pdf_output_bytes', "Size of rendered PDFs.", self.size)
+            histogram('eli_pdf_pages', "Pages per rendered PDF.", self.pages)
+            lines.append("# HELP eli_pdf_queue_depth Requests admitted but not yet answered.")
+            lines.append("# TYPE eli_pdf_queue_depth gauge")
+            lines.append(f"eli_pdf_queue_depth{_format_labels(const)} {self.queue_depth}")
+        return "\n".join(lines) + "\n"
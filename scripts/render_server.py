@@ -0,0 +1,246 @@
+"""
+Local PDF render server over a Unix domain socket.
+
+    python scripts/render_server.py --socket /tmp/eli-render.sock \
+        [--max-concurrency 4] [--max-queue 32] [--max-request-bytes N]
+
+Each connection speaks the generate_pdf.py --worker protocol: one JSON
+request per line, one JSON reply per line, with any ``id`` echoed back.
+Replies are written as renders finish, so they may arrive out of order.
+
+Renders run on a process pool of --max-concurrency workers. At most
+--max-queue further requests may wait behind them; past that a request is
+answered immediately with ``{"error": "busy", "busy": true}`` so callers
+can back off. A request line longer than --max-request-bytes is skipped
+and answered with an error. If a pool worker dies mid-render (e.g. killed
+for memory) its requests fail with ``"success": false`` and the pool is
+replaced. SIGTERM (or SIGINT) stops accepting connections, finishes every
+admitted render, then exits.
+
+``{"type": "metrics"}`` returns the server's Prometheus metrics in the
+reply's ``metrics`` field; --metrics-file also keeps them in a file.
+--trace-log appends an NDJSON trace record per document.
+"""
+import os
+import sys
+import json
+import signal
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import generate_pdf
+
+# Longest request line accepted. asyncio's default stream limit (64 KiB)
+# is smaller than a batch of a few dozen documents.
+DEFAULT_MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+async def read_line(reader):
+    """The next line from ``reader``, or b'' at end of stream.
+
+    A line longer than the reader's limit is read to its end and dropped,
+    so the connection stays in step, and RequestTooLarge is raised.
+    """
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        consumed = e.consumed
+    while True:
+        try:
+            await reader.readexactly(consumed)
+            await reader.readuntil(b'\n')
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+            continue
+        except asyncio.IncompleteReadError:
+            pass
+        raise RequestTooLarge()
+
+
+def _init_server_worker():
+    generate_pdf._init_pool_worker()
+    # Workers are forked after the event loop installed its signal handlers.
+    # Drop them: otherwise a SIGTERM sent to a worker (as the pool does when
+    # one of them dies) wakes the server's loop and starts a drain, and a
+    # terminal's Ctrl-C would kill renders the server means to finish.
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class RenderServer:
+    def __init__(self, socket_path, max_concurrency=4, max_queue=32, metrics_file=None,
+                 max_request_bytes=DEFAULT_MAX_REQUEST_BYTES):
+        self.socket_path = socket_path
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_request_bytes = max_request_bytes
+        self.pending = 0  # admitted requests, running or waiting
+        self.draining = False
+        self.executor = None
+        self.server = None
+        self.connections = {}  # handler task -> stream writer
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.stopping = asyncio.Event()
+        self.metrics = generate_pdf.enable_metrics(metrics_file)
+
+    def admit(self):
+        """Reserve a slot for one request. Returns False when full."""
+        if self.draining or self.pending >= self.max_concurrency + self.max_queue:
+            return False
+        self.pending += 1
+        self.idle.clear()
+        generate_pdf.set_queue_depth(self.pending)
+        return True
+
+    def release(self):
+        self.pending -= 1
+        generate_pdf.set_queue_depth(self.pending)
+        if self.pending == 0:
+            self.idle.set()
+
+    def new_executor(self):
+        # Pool workers are forked on demand and inherit the warmed-up state.
+        return ProcessPoolExecutor(max_workers=self.max_concurrency, initializer=_init_server_worker)
+
+    def replace_executor(self, broken):
+        """Swap a pool that lost a worker for a fresh one (once per broken pool)."""
+        if self.executor is not broken:
+            return
+        print("Render worker died; restarting the process pool", file=sys.stderr)
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executor = self.new_executor()
+
+    async def send(self, writer, reply):
+        if not writer.is_closing():
+            writer.write((json.dumps(reply) + "\n").encode())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def process(self, line, writer):
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            reply = {"error": f"Invalid JSON: {e}"}
+        else:
+            if not isinstance(request, dict):
+                reply = {"error": "Request must be a JSON object"}
+            elif request.get('type') == 'metrics':
+                reply = {"success": True, "metrics": self.metrics.render()}
+            elif not self.admit():
+                reply = {"error": "busy", "busy": True}
+            else:
+                executor = self.executor
+                try:
+                    loop = asyncio.get_running_loop()
+                    reply = generate_pdf.publish(
+                        await loop.run_in_executor(executor, generate_pdf.render, request))
+                except BrokenProcessPool:
+                    reply = {"success": False, "error": "Render worker exited unexpectedly"}
+                    self.replace_executor(executor)
+                except Exception as e:
+                    reply = {"error": str(e)}
+                finally:
+                    self.release()
+            if 'id' in request:
+                reply['id'] = request['id']
+        await self.send(writer, reply)
+
+    async def handle_connection(self, reader, writer):
+        tasks = set()
+        self.connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                except RequestTooLarge:
+                    await self.send(writer, {"error": f"Request line exceeds {self.max_request_bytes} bytes"})
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self.process(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            # Let this connection's in-flight replies go out before closing.
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self.connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    def shutdown(self):
+        if self.draining:
+            return
+        print("Draining render server", file=sys.stderr)
+        self.draining = True
+        self.server.close()
+        self.stopping.set()
+
+    async def run(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        generate_pdf.warm_up()
+        self.executor = self.new_executor()
+        self.server = await asyncio.start_unix_server(self.handle_connection, path=self.socket_path,
+                                                      limit=self.max_request_bytes)
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.shutdown)
+        print(f"Render server listening on {self.socket_path} "
+              f"(concurrency {self.max_concurrency}, queue {self.max_queue})", file=sys.stderr)
+
+        try:
+            await self.stopping.wait()
+            await self.idle.wait()
+            # Every admitted render has replied; hang up on idle clients.
+            for writer in self.connections.values():
+                writer.close()
+            if self.connections:
+                await asyncio.gather(*self.connections, return_exceptions=True)
+        finally:
+            self.executor.shutdown(wait=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PDF renders over a Unix domain socket.")
+    parser.add_argument('--socket', required=True, help="Unix socket path to listen on")
+    parser.add_argument('--max-concurrency', type=int, default=os.cpu_count() or 1,
+                        help="renders running at once (default: CPU count)")
+    parser.add_argument('--max-queue', type=int, default=32,
+                        help="admitted requests allowed to wait for a free worker before replying busy")
+    parser.add_argument('--max-request-bytes', type=int, default=DEFAULT_MAX_REQUEST_BYTES,
+                        help="longest request line accepted (default: 16 MiB)")
+    parser.add_argument('--metrics-file', help="keep Prometheus text metrics in this file")
+    parser.add_argument('--trace-log', default=os.environ.get('ELI_PDF_TRACE_LOG'),
+                        help="append an NDJSON trace record per document (default: $ELI_PDF_TRACE_LOG)")
+    args = parser.parse_args()
+
+    if args.trace_log:
+        generate_pdf.enable_trace_log(args.trace_log)
+
+    server = RenderServer(args.socket, max_concurrency=args.max_concurrency,
+                          max_queue=args.max_queue, metrics_file=args.metrics_file,
+                          max_request_bytes=args.max_request_bytes)
+    asyncio.run(server.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Structured render trace log, and a percentile report over it.
+
+Renderers started with --trace-log PATH (or ELI_PDF_TRACE_LOG=PATH) append
+one JSON record per rendered document to PATH, rotating it by size. Each
+record holds the caller's correlationId, the document type, line-item
+counts, per-phase timings, total time, bytes and pages.
+
+    python scripts/render_trace.py trace.ndjson [trace.ndjson.1 ...]
+
+prints p50/p95/p99 render time and size per document type and per
+line-item count bucket.
+"""
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+# Upper bounds of the line-item buckets used by the report.
+ITEM_BUCKETS = (10, 50, 200, 1000)
+
+
+class TraceLog:
+    """Append render stats to a size-rotated NDJSON file."""
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5):
+        self.logger = logging.getLogger(f'eli_pdf_trace.{path}')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+
+    def write(self, stats):
+        """Write one record per document in ``stats``."""
+        ts = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        for s in stats:
+            record = {
+                'ts': ts,
+                'correlation_id': s.get('correlation_id'),
+                'type': s.get('type'),
+                'ok': s.get('ok'),
+                'ms': round(s['seconds'] * 1000, 3),
+                'bytes': s.get('bytes'),
+                'pages': s.get('pages'),
+                'items': s.get('items', {}),
+                'phases': s.get('phases', {}),
+            }
+            if s.get('error'):
+                record['error'] = s['error']
+            self.logger.info(json.dumps(record))
+
+
+def item_bucket(count):
+    lower = 0
+    for upper in ITEM_BUCKETS:
+        if count < upper:
+            return f"{lower}-{upper - 1}"
+        lower = upper
+    return f"{lower}+"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * pct // 100))  # ceil
+    return values[int(rank) - 1]
+
+
+def read_records(paths):
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarise(records):
+    """Group records by type and by line-item bucket. Returns {group: stats}."""
+    groups = {}
+    for r in records:
+        n_items = sum(r.get('items', {}).values())
+        for key in (f"type={r.get('type')}", f"items={item_bucket(n_items)}"):
+            g = groups.setdefault(key, {'ms': [], 'bytes': [], 'errors': 0})
+            if not r.get('ok'):
+                g['errors'] += 1
+                continue
+            g['ms'].append(r['ms'])
+            if r.get('bytes') is not None:
+                g['bytes'].append(r['bytes'])
+    for g in groups.values():
+        g['ms'].sort()
+        g['bytes'].sort()
+    return groups
+
+
+def _sort_key(group):
+    kind, _, value = group.partition('=')
+    lower = value.split('-')[0].rstrip('+')
+    return (kind, int(lower) if lower.isdigit() else value)
+
+
+def format_report(groups):
+    header = (f"{'group':<18}{'n':>7}{'err':>6}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              f"{'p50 KB':>10}{'p95 KB':>10}{'p99 KB':>10}")
+    lines = [header, '-' * len(header)]
+
+    def fmt(value, scale=1.0):
+        return f"{value / scale:10.1f}" if value is not None else f"{'-':>10}"
+
+    for name in sorted(groups, key=_sort_key):
+        g = groups[name]
+        ms, size = g['ms'], g['bytes']
+        lines.append(f"{name:<18}{len(ms):>7}{g['errors']:>6}"
+                     + ''.join(fmt(percentile(ms, p)) for p in (50, 95, 99))
+                     + ''.join(fmt(percentile(size, p), 1024) for p in (50, 95, 99)))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise PDF render trace logs.")
+    parser.add_argument('paths', nargs='+', help="trace log files (include rotated .1, .2 ... files as needed)")
+    args = parser.parse_args()
+
+    groups = summarise(read_records(args.paths))
+    if not groups:
+        print("No trace records found.", file=sys.stderr)
+        sys.exit(1)
+    print(format_report(groups))
+
+
+if __name__ == "__main__":
+    main()
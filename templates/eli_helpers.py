@@ -1,11 +1,26 @@
 """
 ELI MOTORS LIMITED - Shared PDF helpers
-Common header drawing, page-break logic, table styles, and image lookup.
+Common header drawing, page-break logic, table styles, image lookup,
+and optional per-phase render timings.
 """
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.colors import HexColor, black, white
-from reportlab.platypus import Table, TableStyle
+from reportlab.platypus import TableStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.lib.rl_accel import fp_str
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps, lru_cache
+from eli_tables import FixedTable, _rgb
+from eli_text import text_width, wrap_text
 import os
+import sys
+import json
+import time
+import hashlib
+import threading
 
 # ── Colours ───────────────────────────────────────────────────
 HEADER_BG = HexColor('#d9d9d9')
@@ -14,41 +29,201 @@ BORDER_COLOR = HexColor('#cccccc')
 
 BOTTOM_MARGIN = 40  # points from page bottom
 
+# Write streams as binary rather than ASCII85: A85 adds a quarter to every
+# image and content stream, and ReportLab's pure-Python encoder is slow.
+rl_config.useA85 = 0
+
+# Images the templates draw, resolved and decoded by load_assets().
+TEMPLATE_IMAGES = ('eli_logo_white.png', 'car_diagram.png')
+
+# Asset registry: image name -> decoded ImageReader, or the file path for
+# JPEGs, or None if the image was not found. Filled once per process.
+_assets = {}
+_assets_lock = threading.Lock()
+
+
+# ── Render timings ────────────────────────────────────────────
+class RenderTimings:
+    """Seconds spent per named phase of one render, plus its page count."""
+
+    def __init__(self):
+        self.phases = {}
+        self.pages = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_timings = ContextVar('eli_render_timings', default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Record timed() phases of renders run inside this block."""
+    timings = RenderTimings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def timed(phase):
+    """Time the enclosed block as ``phase`` when timings are being collected."""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+def timed_phase(phase):
+    """Decorator form of timed()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def save_canvas(c):
+    """Save the canvas, recording its page count and the save time."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.pages = c.getPageNumber()
+    with timed('save'):
+        c.save()
+
+
+def _asset_manifest(asset_dir):
+    """Image name -> built file name from scripts/build_assets.py, if any."""
+    try:
+        with open(os.path.join(asset_dir, 'assets.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
 
 def find_image(name):
-    """Locate an image file across common paths."""
-    for p in [name,
-              os.path.join(os.path.dirname(__file__), name),
-              f'/home/claude/{name}',
-              f'/mnt/user-data/uploads/{name}',
-              f'/mnt/user-data/outputs/{name}']:
+    """Locate an image file across common paths.
+
+    ``ELI_ASSET_DIR`` is checked first; the packaged renderer sets it to the
+    directory holding its copies of the images. When that directory has an
+    assets.json manifest, the built (resampled) copy is used.
+    """
+    candidates = [name,
+                  os.path.join(os.path.dirname(__file__), name),
+                  f'/home/claude/{name}',
+                  f'/mnt/user-data/uploads/{name}',
+                  f'/mnt/user-data/outputs/{name}']
+    asset_dir = os.environ.get('ELI_ASSET_DIR')
+    if asset_dir:
+        candidates.insert(0, os.path.join(asset_dir, name))
+        built = _asset_manifest(asset_dir).get(name)
+        if built:
+            candidates.insert(0, os.path.join(asset_dir, built))
+    for p in candidates:
         if os.path.exists(p):
             return p
     return None
 
 
-def draw_company_header(c, data, w, h, left_margin, right_margin):
-    """Draw company name, address, and logo. Returns top-of-content y."""
-    top = h - 25
+def _load_asset(name):
+    path = find_image(name)
+    if path is None:
+        print(f"Warning: image {name} not found "
+              f"(ELI_ASSET_DIR={os.environ.get('ELI_ASSET_DIR') or 'unset'}); drawing without it",
+              file=sys.stderr)
+        return None
+    reader = ImageReader(path)
+    if reader.jpeg_fh():
+        # JPEGs are embedded undecoded, and a shared reader's file
+        # position would race between threads; draw from the path.
+        return path
+    reader.getRGBData()  # force the decode now, not on first draw
+    return reader
+
+
+def load_assets(*names):
+    """Resolve and decode images once per process. Returns the missing names.
+
+    Called at start-up by long-running renderers so missing images are
+    reported straight away and forked workers inherit the decoded copies.
+    """
+    with _assets_lock:
+        for name in names or TEMPLATE_IMAGES:
+            if name not in _assets:
+                _assets[name] = _load_asset(name)
+    return [name for name in names or TEMPLATE_IMAGES if _assets[name] is None]
+
+
+def image_source(name):
+    """Registered ImageReader or path for an image (None if missing)."""
+    try:
+        return _assets[name]
+    except KeyError:
+        load_assets(name)
+        return _assets[name]
+
+
+@lru_cache(maxsize=32)
+def _company_form_name(key):
+    return 'ELICompany' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def company_form_name(company, top, left_margin, right_margin):
+    """Form XObject name for a company block drawn at this position.
+
+    Names are derived from the company data and geometry, so every document
+    (and every page) showing the same block refers to it by the same name.
+    """
+    key = json.dumps([company, top, left_margin, right_margin], sort_keys=True, default=str)
+    return _company_form_name(key)
+
+
+def _draw_company_block(c, company, top, left_margin, right_margin):
     c.setFont("Helvetica-Bold", 18)
-    c.drawString(left_margin, top, data['company']['name'])
+    c.drawString(left_margin, top, company['name'])
 
     c.setFont("Helvetica", 8)
     y = top - 16
-    c.drawString(left_margin, y, data['company']['address_line1'])
+    c.drawString(left_margin, y, company['address_line1'])
     y -= 11
-    c.drawString(left_margin, y, data['company']['phone'])
+    c.drawString(left_margin, y, company['phone'])
     y -= 11
-    c.drawString(left_margin, y, data['company']['website'])
+    c.drawString(left_margin, y, company['website'])
     y -= 11
-    c.drawString(left_margin, y, f"VAT {data['company']['vat']}")
+    c.drawString(left_margin, y, f"VAT {company['vat']}")
 
-    logo_path = find_image('eli_logo_white.png')
+    logo_path = image_source('eli_logo_white.png')
     if logo_path:
         logo_w = 120
         logo_h = logo_w * (865.0 / 1930.0)
-        c.drawImage(logo_path, right_margin - logo_w, top - logo_h + 15,
-                    width=logo_w, height=logo_h, preserveAspectRatio=True)
+        with timed('images'):
+            c.drawImage(logo_path, right_margin - logo_w, top - logo_h + 15,
+                        width=logo_w, height=logo_h, preserveAspectRatio=True)
+
+
+def draw_company_header(c, data, w, h, left_margin, right_margin):
+    """Draw company name, address, and logo. Returns top-of-content y.
+
+    The block is recorded once per document as a form XObject and placed
+    by reference on every page that shows it.
+    """
+    top = h - 25
+    name = company_form_name(data['company'], top, left_margin, right_margin)
+    if not c.hasForm(name):
+        c.beginForm(name)
+        _draw_company_block(c, data['company'], top, left_margin, right_margin)
+        c.endForm()
+    c.doForm(name)
 
     c.setFillColor(black)
     return top
@@ -99,6 +274,222 @@ def check_page_break(c, y, needed, data, w, h, left_margin, right_margin, page_w
     return y
 
 
+def wrap_lines(texts, font, size, width, prefix=''):
+    """Wrap each text to ``width`` for draw_text_lines.
+
+    Each text's first line starts with ``prefix`` (a bullet, say) and its
+    continuation lines are indented to line up after it, as (indent, line)
+    pairs. Texts that are not strings (a number, None) are drawn as str().
+    """
+    indent = text_width(prefix, font, size)
+    lines = []
+    for text in texts:
+        first, *rest = wrap_text(str(text), font, size, width - indent)
+        lines.append(prefix + first)
+        lines.extend((indent, line) for line in rest)
+    return lines
+
+
+def draw_text_lines(c, y, lines, x, font, size, leading, data, w, h, left_margin, right_margin,
+                    page_width, redraw_header_fn=None, needed=14):
+    """Draw lines of text down the page from y, flowing across pages.
+
+    Each line must have ``needed`` points above the bottom margin, as with a
+    check_page_break before every line, but the breaks are worked out up
+    front so each page's run is one text object stepping by ``leading``.
+    A line may be an (indent, text) pair to start it right of ``x``.
+    Returns y below the last line.
+    """
+    start, n = 0, len(lines)
+    while start < n:
+        y = check_page_break(c, y, needed, data, w, h, left_margin, right_margin, page_width,
+                             redraw_header_fn=redraw_header_fn)
+        end = start + 1
+        line_y = y - leading
+        while end < n and line_y - needed >= BOTTOM_MARGIN:
+            end += 1
+            line_y -= leading
+
+        c.setFont(font, size, leading)
+        tx = c.beginText(x, y)
+        indent = 0
+        for line in lines[start:end]:
+            if not isinstance(line, str):
+                dx, line = line
+                if dx != indent:
+                    tx.moveCursor(dx - indent, 0)
+                    indent = dx
+            elif indent:
+                tx.moveCursor(-indent, 0)
+                indent = 0
+            tx.textLine(line)
+        c.drawText(tx)
+        y -= (end - start) * leading
+        start = end
+    return y
+
+
+def draw_split_table(c, y, rows, col_widths, style, data, w, h, left_margin, right_margin,
+                     page_width, redraw_header_fn=None, phase='table'):
+    """Draw a table whose first row is its header, flowing across pages.
+
+    Rows are measured once. Each page then gets the header row plus as many
+    body rows as fit, with check_page_break (and ``redraw_header_fn``)
+    starting the next page, so layout cost stays linear in the row count.
+    Returns y below the last piece.
+    """
+    with timed(f'{phase}.wrap'):
+        table = FixedTable(rows, col_widths, style)
+    heights = table.row_heights
+    n = len(rows)
+
+    start = 1
+    while True:
+        first = heights[start] if start < n else 0
+        y = check_page_break(c, y, heights[0] + first, data, w, h, left_margin, right_margin,
+                             page_width, redraw_header_fn=redraw_header_fn)
+        room = y - BOTTOM_MARGIN - heights[0]
+        end = start
+        while end < n and heights[end] <= room:
+            room -= heights[end]
+            end += 1
+        if end == start and start < n:
+            end = start + 1  # a row taller than a whole page; draw it anyway
+
+        piece_h = heights[0] + sum(heights[start:end])
+        with timed(f'{phase}.drawOn'):
+            table.draw_rows(c, left_margin, y - piece_h, [0] + list(range(start, end)))
+        y -= piece_h
+        start = end
+        if start >= n:
+            return y
+
+
+# ── Static layers ─────────────────────────────────────────────
+class StaticLayer:
+    """Drawing that is the same on every document, built once and cached.
+
+    ``ops`` is font-free PDF content (fills and rules) relative to the
+    layer's origin, emitted as-is. ``texts`` are (font, size, x, y, text,
+    align) runs, drawn through the canvas so fonts register per document.
+    """
+    __slots__ = ('ops', 'texts', 'height')
+
+    def __init__(self, ops, texts, height=0):
+        self.ops = ops
+        self.texts = texts
+        self.height = height
+
+
+def draw_static_layer(c, layer, x, y):
+    """Place ``layer`` with its origin at (x, y)."""
+    c.saveState()
+    c.translate(x, y)
+    if layer.ops:
+        c.addLiteral(layer.ops)
+    c.setFillColor(black)
+    current = None
+    for font, size, tx, ty, text, align in layer.texts:
+        if (font, size) != current:
+            c.setFont(font, size)
+            current = (font, size)
+        if align == 'CENTER':
+            c.drawCentredString(tx, ty, text)
+        elif align == 'RIGHT':
+            c.drawRightString(tx, ty, text)
+        else:
+            c.drawString(tx, ty, text)
+    c.restoreState()
+
+
+# ── Layout cache ──────────────────────────────────────────────
+class LayoutCache:
+    """Bounded LRU of measured blocks, shared by every render in the process.
+
+    Keys carry the block's content and the width it was laid out at, so a
+    batch or long-lived worker measures each distinct block once however
+    many documents repeat it. Cached blocks are shared between threads and
+    must only be read when drawn.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """The block for ``key``, from ``build()`` the first time it is seen."""
+        with self._lock:
+            try:
+                self._blocks.move_to_end(key)
+                self.hits += 1
+                return self._blocks[key]
+            except KeyError:
+                self.misses += 1
+        block = build()  # outside the lock; a racing thread may build it too
+        with self._lock:
+            self._blocks[key] = block
+            if len(self._blocks) > self.maxsize:
+                self._blocks.popitem(last=False)
+        return block
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self.hits = self.misses = 0
+
+
+layout_cache = LayoutCache()
+
+
+@lru_cache(maxsize=64)
+def grid_layer(headers, col_widths, rows, header_h=20, row_h=22, font_size=8.5):
+    """A header row plus ``rows`` empty ruled rows, as data_table_style draws them.
+
+    The origin is the grid's bottom-left corner; ``height`` is its height.
+    """
+    width = sum(col_widths)
+    height = header_h + row_h * rows
+    ops = [f"{_rgb(HEADER_BG)} rg", f"n 0 {fp_str(height - header_h)} {fp_str(width)} {fp_str(header_h)} re f",
+           "1 J 1 j", f"{_rgb(BORDER_COLOR)} RG", ".5 w"]
+    for y in [height, height - header_h] + [row_h * i for i in range(rows)]:
+        ops.append(f"n 0 {fp_str(y)} m {fp_str(width)} {fp_str(y)} l S")
+    x = 0
+    for cw in (0,) + tuple(col_widths):
+        x += cw
+        ops.append(f"n {fp_str(x)} 0 m {fp_str(x)} {fp_str(height)} l S")
+
+    # Vertically centred as Table does it, for 12pt leading.
+    baseline = height - header_h + (header_h + 12) / 2.0 - font_size
+    texts = []
+    x = 0
+    for label, cw in zip(headers, col_widths):
+        texts.append(('Helvetica-Bold', font_size, x + cw / 2.0, baseline, label, 'CENTER'))
+        x += cw
+    return StaticLayer("\n".join(ops), tuple(texts), height)
+
+
+def draw_split_grid(c, y, headers, col_widths, rows, data, w, h, left_margin, right_margin,
+                    page_width, redraw_header_fn=None, phase='grid', header_h=20, row_h=22):
+    """Draw a grid_layer() of ``rows`` empty rows, flowing across pages.
+
+    Each page repeats the header row. Returns y below the last piece.
+    """
+    remaining = rows
+    while True:
+        y = check_page_break(c, y, header_h + (row_h if remaining else 0), data, w, h,
+                             left_margin, right_margin, page_width, redraw_header_fn=redraw_header_fn)
+        fit = max(1, int((y - BOTTOM_MARGIN - header_h) // row_h))
+        layer = grid_layer(headers, col_widths, min(fit, remaining), header_h, row_h)
+        with timed(f'{phase}.drawOn'):
+            draw_static_layer(c, layer, left_margin, y - layer.height)
+        y -= layer.height
+        remaining -= min(fit, remaining)
+        if not remaining:
+            return y
+
+
 def vehicle_table_style():
     return TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), HEADER_BG),
@@ -122,7 +513,8 @@ def vehicle_table_style():
     ])
 
 
-def data_table_style_commands():
+def data_table_style_commands(value_align='RIGHT'):
+    """Style for the labour/parts/MOT tables; ``value_align`` is for columns 1+ of body rows."""
     return [
         ('BACKGROUND', (0, 0), (-1, 0), HEADER_BG),
         ('TEXTCOLOR', (0, 0), (-1, 0), HEADER_TEXT),
@@ -130,7 +522,7 @@ def data_table_style_commands():
         ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
         ('FONTSIZE', (0, 0), (-1, -1), 8.5),
         ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('ALIGN', (1, 1), (-1, -1), value_align),
         ('ALIGN', (0, 1), (0, -1), 'LEFT'),
         ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
         ('LEFTPADDING', (0, 0), (-1, -1), 6),
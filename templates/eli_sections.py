@@ -0,0 +1,292 @@
+"""
+ELI MOTORS LIMITED - Section engine
+A document type is a Plan: its page header and the sections that flow down
+the page below it, as (kind, options) pairs. compile_plan() turns each
+section into a draw function once per process, building everything that
+does not depend on the payload (column widths, table styles, image sizes)
+up front; render_plan() runs the compiled sections for one document.
+Blocks laid out from content alone (the vehicle table, the T&C paragraph)
+come from layout_cache, so repeats across documents are measured once.
+"""
+import copy
+from functools import lru_cache
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.colors import HexColor
+from reportlab.pdfgen import canvas
+from eli_helpers import (
+    BORDER_COLOR,
+    image_source, check_page_break, wrap_lines, draw_text_lines, draw_split_table,
+    draw_split_grid, draw_static_layer,
+    vehicle_table_style, data_table_style_commands,
+    build_vehicle_data, VEHICLE_COL_WIDTHS_RATIOS, tc_text,
+    timed, save_canvas, layout_cache
+)
+from eli_tables import FixedTable
+from eli_text import text_width, wrap_text
+
+# Page geometry shared by every document.
+PAGE_W, PAGE_H = A4
+LEFT_MARGIN = 30
+RIGHT_MARGIN = PAGE_W - 30
+PAGE_WIDTH = RIGHT_MARGIN - LEFT_MARGIN
+
+CAR_DIAGRAM_ASPECT = 274.0 / 355.0
+
+
+class Plan:
+    """A document type: title, header function and (kind, options) sections.
+
+    ``header(c, data, w, h, left_margin, right_margin, page_width)`` draws
+    the page header and returns y below it; it is redrawn on every page.
+    """
+    __slots__ = ('title', 'header', 'sections')
+
+    def __init__(self, title, header, sections):
+        self.title = title
+        self.header = header
+        self.sections = tuple(sections)
+
+
+class Document:
+    """One render in progress: the canvas, its payload and its header."""
+    __slots__ = ('c', 'data', 'header')
+
+    def __init__(self, c, data, header):
+        self.c = c
+        self.data = data
+        self.header = header
+
+    def page_break(self, y, needed):
+        return check_page_break(self.c, y, needed, self.data, PAGE_W, PAGE_H,
+                                LEFT_MARGIN, RIGHT_MARGIN, PAGE_WIDTH, redraw_header_fn=self.header)
+
+
+# ── Sections ──────────────────────────────────────────────────
+# Each takes the section's options and returns draw(doc, y) -> y.
+
+def _space(points):
+    def draw(doc, y):
+        return y - points
+    return draw
+
+
+def _vehicle_table():
+    col_widths = tuple(PAGE_WIDTH * r for r in VEHICLE_COL_WIDTHS_RATIOS)
+    style = vehicle_table_style().getCommands()
+
+    def draw(doc, y):
+        rows = tuple(tuple(row) for row in build_vehicle_data(doc.data['vehicle']))
+        with timed('vehicle_table.wrap'):
+            vt = layout_cache.get(('vehicle_table', rows, col_widths),
+                                  lambda: FixedTable(rows, col_widths, style))
+            _, vt_h = vt.wrap(PAGE_WIDTH, 200)
+        y = doc.page_break(y, vt_h)
+        with timed('vehicle_table.drawOn'):
+            vt.drawOn(doc.c, LEFT_MARGIN, y - vt_h)
+        return y - vt_h
+    return draw
+
+
+def _diagram(width_ratio, space_before=0, extra_room=0, space_after=0):
+    """The car diagram, kept on one page with ``extra_room`` below it."""
+    dw = PAGE_WIDTH * width_ratio
+    dh = dw * CAR_DIAGRAM_ASPECT
+
+    def draw(doc, y):
+        diagram = image_source('car_diagram.png')
+        if not diagram:
+            return y
+        y = doc.page_break(y - space_before, dh + extra_room)
+        with timed('images'):
+            doc.c.drawImage(diagram, LEFT_MARGIN, y - dh,
+                            width=dw, height=dh, preserveAspectRatio=True, anchor='sw')
+        return y - dh - space_after
+    return draw
+
+
+def _work_title(font='Helvetica-Bold', size=10):
+    """data['work_title'], wrapped, each line underlined."""
+    def draw(doc, y):
+        if not doc.data.get('work_title'):
+            return y
+        c = doc.c
+        title_lines = wrap_text(doc.data['work_title'], font, size, PAGE_WIDTH)
+        y = doc.page_break(y, 20 + 12 * (len(title_lines) - 1))
+        c.setFont(font, size)
+        for i, title in enumerate(title_lines):
+            if i:
+                y -= 12
+            tw = text_width(title, font, size)
+            c.drawString(LEFT_MARGIN, y, title)
+            c.setLineWidth(0.5)
+            c.line(LEFT_MARGIN, y - 2, LEFT_MARGIN + tw, y - 2)
+        return y - 16
+    return draw
+
+
+def _text_lines(lines, prefix='', wrap=True, font='Helvetica', size=9, leading=13):
+    """A run of lines from ``lines(data)``, wrapped to the page unless ``wrap`` is off."""
+    def draw(doc, y):
+        texts = lines(doc.data)
+        if wrap:
+            texts = wrap_lines(texts, font, size, PAGE_WIDTH, prefix=prefix)
+        elif prefix:
+            texts = [prefix + t for t in texts]
+        return draw_text_lines(doc.c, y, texts, LEFT_MARGIN, font, size, leading, doc.data,
+                               PAGE_W, PAGE_H, LEFT_MARGIN, RIGHT_MARGIN, PAGE_WIDTH,
+                               redraw_header_fn=doc.header)
+    return draw
+
+
+def _line_table(headers, col_ratios, rows, phase, value_align='RIGHT', optional=False, space_after=0):
+    """A header row plus ``rows(data)``, split across pages, then ``space_after``.
+
+    With ``optional`` the table (and the space after it) is left out when
+    ``rows`` gives no rows.
+    """
+    col_widths = [PAGE_WIDTH * r for r in col_ratios]
+    style = data_table_style_commands(value_align)
+    headers = list(headers)
+
+    def draw(doc, y):
+        body = rows(doc.data)
+        if optional and not body:
+            return y
+        y = draw_split_table(doc.c, y, [headers] + body, col_widths, style, doc.data,
+                             PAGE_W, PAGE_H, LEFT_MARGIN, RIGHT_MARGIN, PAGE_WIDTH,
+                             redraw_header_fn=doc.header, phase=phase)
+        return y - space_after
+    return draw
+
+
+def _blank_grid(headers, col_ratios, count, phase):
+    """``count(data)`` empty ruled rows under a header row, split across pages."""
+    col_widths = tuple(PAGE_WIDTH * r for r in col_ratios)
+    headers = tuple(headers)
+
+    def draw(doc, y):
+        return draw_split_grid(doc.c, y, headers, col_widths, count(doc.data), doc.data,
+                               PAGE_W, PAGE_H, LEFT_MARGIN, RIGHT_MARGIN, PAGE_WIDTH,
+                               redraw_header_fn=doc.header, phase=phase)
+    return draw
+
+
+def _static_block(layer, phase):
+    """A StaticLayer from ``layer()``, kept on one page."""
+    def draw(doc, y):
+        block = layer()
+        y = doc.page_break(y, block.height)
+        with timed(phase):
+            draw_static_layer(doc.c, block, LEFT_MARGIN, y)
+        return y
+    return draw
+
+
+def _totals_footer(totals, tc_width_ratio):
+    """T&C and signature line beside the totals table.
+
+    ``totals(data)`` returns the totals rows and the index of the row to
+    highlight as the total.
+    """
+    # Imported here so plans without a footer (job sheets) skip platypus text.
+    from reportlab.platypus import Paragraph
+    from reportlab.lib.styles import ParagraphStyle
+
+    tt_w = PAGE_WIDTH * 0.35
+    tcw = [PAGE_WIDTH * 0.20, PAGE_WIDTH * 0.15]
+    base_style = [
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTNAME', (0, 2), (-1, 2), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+        ('TOPPADDING', (0, 0), (-1, -1), 3),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, BORDER_COLOR),
+    ]
+    total_bg = HexColor('#e8e8e8')
+    tc_style = ParagraphStyle('tc', fontName='Helvetica', fontSize=7, leading=9)
+    tc_w = PAGE_WIDTH * tc_width_ratio
+
+    def wrapped_tc(text):
+        para = Paragraph(text, tc_style)
+        _, height = para.wrap(tc_w, 200)
+        return para, height
+
+    def draw(doc, y):
+        c = doc.c
+        rows, total_idx = totals(doc.data)
+        tt = FixedTable(rows, tcw, base_style + [
+            ('FONTNAME', (0, total_idx), (-1, total_idx), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, total_idx), (-1, total_idx), total_bg),
+        ])
+        with timed('totals_table.wrap'):
+            _, tt_h = tt.wrap(tt_w, 200)
+
+        text = tc_text()
+        with timed('tc.wrap'):
+            tc_para, tc_h = layout_cache.get(('tc', text, tc_w), lambda: wrapped_tc(text))
+        footer_h = max(tt_h, tc_h + 15)
+
+        y = doc.page_break(y, footer_h)
+        with timed('tc.drawOn'):
+            # drawOn sets attributes on the flowable; draw a copy of the shared one.
+            copy.copy(tc_para).drawOn(c, LEFT_MARGIN, y - tc_h)
+        c.setFont("Helvetica", 7)
+        c.drawString(LEFT_MARGIN, y - tc_h - 12, "Signed ________________    Date ________________")
+        with timed('totals_table.drawOn'):
+            tt.drawOn(c, RIGHT_MARGIN - tt_w, y - tt_h)
+        return y
+    return draw
+
+
+# Labour and parts tables: description, qty, unit price, discount, subtotal.
+PRICED_COL_RATIOS = (0.52, 0.10, 0.14, 0.10, 0.14)
+
+
+def priced_rows(key):
+    """Rows function for a labour or parts table of ``data[key]`` line items."""
+    def rows(data):
+        return [[
+            item['description'], str(item.get('qty', '')),
+            f"{item['unit']:.2f}" if item.get('unit') else '',
+            str(item.get('d', '')),
+            f"{item['subtotal']:.2f}" if item.get('subtotal') else ''
+        ] for item in data.get(key, [])]
+    return rows
+
+
+SECTIONS = {
+    'space': _space,
+    'vehicle_table': _vehicle_table,
+    'diagram': _diagram,
+    'work_title': _work_title,
+    'text_lines': _text_lines,
+    'line_table': _line_table,
+    'blank_grid': _blank_grid,
+    'static_block': _static_block,
+    'totals_footer': _totals_footer,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_plan(plan):
+    """The plan's sections as draw functions, built once per plan."""
+    return tuple(SECTIONS[kind](**options) for kind, options in plan.sections)
+
+
+def render_plan(plan, output_path, data):
+    """Render ``data`` to ``output_path`` (a path or file object) with ``plan``."""
+    sections = compile_plan(plan)
+    c = canvas.Canvas(output_path, pagesize=A4)
+    doc = Document(c, data, plan.header)
+
+    y = plan.header(c, data, PAGE_W, PAGE_H, LEFT_MARGIN, RIGHT_MARGIN, PAGE_WIDTH)
+    for draw in sections:
+        y = draw(doc, y)
+
+    save_canvas(c)
+    if isinstance(output_path, str):
+        print(f"{plan.title} PDF saved to: {output_path}")
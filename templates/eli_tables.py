@@ -0,0 +1,178 @@
+"""
+ELI MOTORS LIMITED - Fixed-column tables
+A drop-in for the platypus Tables the templates draw: fixed column widths,
+plain-text cells and the TableStyle commands eli_helpers uses, drawn
+straight onto the canvas with one text object and a single-path grid.
+"""
+from reportlab.lib.colors import black, toColor
+from reportlab.lib.rl_accel import fp_str
+from eli_text import text_width
+
+# Cell style tuple fields; defaults match platypus CellStyle.
+FONT, SIZE, LEADING, LEFT, RIGHT, TOP, BOTTOM, COLOR, ALIGN, VALIGN = range(10)
+DEFAULT_STYLE = ('Helvetica', 10, 12, 6, 6, 3, 3, black, 'LEFT', 'BOTTOM')
+
+_STYLE_FIELDS = {
+    'FONTNAME': (FONT,), 'FACE': (FONT,), 'FONTSIZE': (SIZE,), 'SIZE': (SIZE,),
+    'LEADING': (LEADING,), 'TEXTCOLOR': (COLOR,),
+    'ALIGN': (ALIGN,), 'ALIGNMENT': (ALIGN,), 'VALIGN': (VALIGN,),
+    'LEFTPADDING': (LEFT,), 'RIGHTPADDING': (RIGHT,),
+    'TOPPADDING': (TOP,), 'BOTTOMPADDING': (BOTTOM,),
+    'FONT': (FONT, SIZE, LEADING),
+}
+
+
+def _span(start, stop, n):
+    """Inclusive cell-range bounds, with negative indices resolved."""
+    return (start + n if start < 0 else start), (stop + n if stop < 0 else stop)
+
+
+def _rgb(color):
+    return fp_str(color.red, color.green, color.blue)
+
+
+class FixedTable:
+    """Table of strings with fixed column widths, styled by TableStyle commands.
+
+    Supports BACKGROUND, GRID and the font, colour, alignment and padding
+    commands, which is everything the templates use; multi-line cells
+    ("\\n") are laid out as platypus does. Styles are resolved once per run
+    of rows the commands treat alike, so cost is linear in the row count.
+    Like a platypus Table it has wrap() and drawOn(); draw_rows() draws a
+    subset of rows, e.g. the header plus one page's worth.
+    """
+
+    def __init__(self, rows, col_widths, style=()):
+        commands = style.getCommands() if hasattr(style, 'getCommands') else list(style)
+        # None cells draw blank, as they do in a platypus Table.
+        self.rows = [['' if v is None else str(v) for v in row] for row in rows]
+        self.col_widths = list(col_widths)
+        self.col_x = [0]
+        for cw in self.col_widths:
+            self.col_x.append(self.col_x[-1] + cw)
+        self.width = self.col_x[-1]
+        n_rows, n_cols = len(self.rows), len(self.col_widths)
+
+        # Rows between consecutive command boundaries are styled alike.
+        cuts = {0, n_rows}
+        spans = []
+        self.grids = []
+        for cmd in commands:
+            op, (c0, r0), (c1, r1), values = cmd[0], cmd[1], cmd[2], cmd[3:]
+            c0, c1 = _span(c0, c1, n_cols)
+            r0, r1 = _span(r0, r1, n_rows)
+            if op == 'GRID':
+                self.grids.append((r0, r1, c0, c1, values[0], toColor(values[1])))
+                continue
+            cuts.update((r0, r1 + 1))
+            spans.append((op, r0, r1, c0, c1, values))
+        cuts = sorted(c for c in cuts if 0 <= c <= n_rows)
+
+        self.row_styles = [None] * n_rows
+        self.row_backgrounds = [None] * n_rows
+        for a, b in zip(cuts, cuts[1:]):
+            cells = [list(DEFAULT_STYLE) for _ in range(n_cols)]
+            backgrounds = []
+            for op, r0, r1, c0, c1, values in spans:
+                if not r0 <= a <= r1:
+                    continue
+                if op == 'BACKGROUND':
+                    backgrounds.append((c0, c1, toColor(values[0])))
+                    continue
+                fields = _STYLE_FIELDS.get(op)
+                if fields is None:
+                    raise ValueError(f"Unsupported table style command: {op}")
+                for col in range(c0, c1 + 1):
+                    for field, value in zip(fields, values):
+                        cells[col][field] = toColor(value) if field == COLOR else value
+            cells = tuple(tuple(cell) for cell in cells)
+            for r in range(a, b):
+                self.row_styles[r] = cells
+                self.row_backgrounds[r] = backgrounds
+
+        self.row_heights = []
+        for row, styles in zip(self.rows, self.row_styles):
+            h = 0
+            for text, s in zip(row, styles):
+                lines = text.count('\n') + 1
+                h = max(h, lines * s[LEADING] + s[TOP] + s[BOTTOM])
+            self.row_heights.append(h)
+        self.height = sum(self.row_heights)
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def drawOn(self, c, x, y):
+        """Draw the whole table with its bottom-left corner at (x, y)."""
+        self.draw_rows(c, x, y, range(len(self.rows)))
+
+    def draw_rows(self, c, x, y, indices):
+        """Draw the given rows stacked top to bottom, bottom-left at (x, y)."""
+        indices = list(indices)
+        tops = []
+        top = y + sum(self.row_heights[r] for r in indices)
+        for r in indices:
+            tops.append(top)
+            top -= self.row_heights[r]
+
+        # Backgrounds, then text, then rules, as platypus orders them.
+        fills = []
+        for r, row_top in zip(indices, tops):
+            for c0, c1, color in self.row_backgrounds[r]:
+                fills.append(f"{_rgb(color)} rg n {fp_str(x + self.col_x[c0], row_top)} "
+                             f"{fp_str(self.col_x[c1 + 1] - self.col_x[c0], -self.row_heights[r])} re f*")
+        if fills:
+            c.addLiteral("q\n" + "\n".join(fills) + "\nQ")
+
+        c.saveState()
+        tx = c.beginText()
+        font = color = None
+        for r, row_top in zip(indices, tops):
+            rh = self.row_heights[r]
+            bottom = row_top - rh
+            for col, (text, s) in enumerate(zip(self.rows[r], self.row_styles[r])):
+                if not text:
+                    continue
+                if (s[FONT], s[SIZE], s[LEADING]) != font:
+                    font = (s[FONT], s[SIZE], s[LEADING])
+                    tx.setFont(*font)
+                if s[COLOR] is not color:
+                    color = s[COLOR]
+                    tx.setFillColor(color)
+                lines = text.split('\n')
+                if s[VALIGN] == 'MIDDLE':
+                    ty = bottom + (s[BOTTOM] + rh - s[TOP] + len(lines) * s[LEADING]) / 2.0 - s[SIZE]
+                elif s[VALIGN] == 'TOP':
+                    ty = row_top - s[TOP] - s[SIZE]
+                else:
+                    ty = bottom + s[BOTTOM] + len(lines) * s[LEADING] - s[SIZE]
+                left = x + self.col_x[col]
+                for line in lines:
+                    if s[ALIGN] == 'LEFT':
+                        tx_x = left + s[LEFT]
+                    else:
+                        width = text_width(line, s[FONT], s[SIZE])
+                        if s[ALIGN] == 'RIGHT':
+                            tx_x = left + self.col_widths[col] - s[RIGHT] - width
+                        else:
+                            tx_x = left + (self.col_widths[col] + s[LEFT] - s[RIGHT] - width) * 0.5
+                    tx.setTextOrigin(tx_x, ty)
+                    tx.textLine(line)  # unlike textOut, does not measure the string again
+                    ty -= s[LEADING]
+        c.drawText(tx)
+        c.restoreState()
+
+        # Each GRID is one path: a rule above every covered row, one below
+        # the last, and a rule down every covered column boundary.
+        for r0, r1, c0, c1, weight, color in self.grids:
+            covered = [(row_top, self.row_heights[r]) for r, row_top in zip(indices, tops) if r0 <= r <= r1]
+            if not covered:
+                continue
+            x0, x1 = fp_str(x + self.col_x[c0]), fp_str(x + self.col_x[c1 + 1])
+            y_top, y_bottom = fp_str(covered[0][0]), fp_str(covered[-1][0] - covered[-1][1])
+            path = [f"{x0} {y} m {x1} {y} l" for y in (fp_str(row_top) for row_top, _ in covered)]
+            path.append(f"{x0} {y_bottom} m {x1} {y_bottom} l")
+            for col in range(c0, c1 + 2):
+                cx = fp_str(x + self.col_x[col])
+                path.append(f"{cx} {y_bottom} m {cx} {y_top} l")
+            c.addLiteral(f"q\n1 J 1 j {_rgb(color)} RG {fp_str(weight)} w\nn " + " ".join(path) + " S\nQ")
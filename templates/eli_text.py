@@ -0,0 +1,58 @@
+"""
+ELI MOTORS LIMITED - Text measurement and wrapping
+String widths and line breaks for the standard fonts, memoized per process
+so the words and phrases that recur across work items and documents are
+measured once.
+"""
+from functools import lru_cache
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+
+@lru_cache(maxsize=16384)
+def text_width(text, font, size):
+    """stringWidth, cached by (text, font, size)."""
+    return stringWidth(text, font, size)
+
+
+def _split_word(word, font, size, width):
+    """Break a word wider than ``width`` into pieces that fit."""
+    pieces, piece, piece_w = [], '', 0
+    for ch in word:
+        ch_w = text_width(ch, font, size)
+        if piece and piece_w + ch_w > width:
+            pieces.append(piece)
+            piece, piece_w = '', 0
+        piece += ch
+        piece_w += ch_w
+    pieces.append(piece)
+    return pieces
+
+
+@lru_cache(maxsize=4096)
+def wrap_text(text, font, size, width):
+    """Break ``text`` into lines no wider than ``width``. Returns a tuple.
+
+    Text that fits comes back unchanged as a single line. Otherwise lines
+    break between words, and a word too long for a line of its own is
+    broken between characters; text with no words is one empty line.
+    """
+    if text_width(text, font, size) <= width:
+        return (text,)
+    space = text_width(' ', font, size)
+    lines, line, line_w = [], [], 0
+    for word in text.split():
+        word_w = text_width(word, font, size)
+        if line and line_w + space + word_w <= width:
+            line.append(word)
+            line_w += space + word_w
+            continue
+        if line:
+            lines.append(' '.join(line))
+        if word_w > width:
+            *full, word = _split_word(word, font, size, width)
+            lines.extend(full)
+            word_w = text_width(word, font, size)
+        line, line_w = [word], word_w
+    if line:
+        lines.append(' '.join(line))
+    return tuple(lines) or ('',)